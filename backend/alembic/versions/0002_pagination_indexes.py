@@ -0,0 +1,34 @@
+"""keyset pagination and history indexes
+
+Idempotent: databases built by create_all may already have these indexes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_services_status_rating_id', 'services', ['status', 'rating', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_payments_created_at_id', 'payments', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_transactions_agent_id_created_at_id', 'transactions', ['agent_id', 'created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_agent_id_created_at_id', table_name='transactions', if_exists=True)
+    op.drop_index('ix_payments_created_at_id', table_name='payments', if_exists=True)
+    op.drop_index('ix_services_status_rating_id', table_name='services', if_exists=True)
@@ -0,0 +1,38 @@
+"""indexer checkpoints
+
+Idempotent: databases built by create_all may already have this table.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table('indexer_checkpoints'):
+        return
+    op.create_table('indexer_checkpoints',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('block_number', sa.Numeric(precision=20, scale=0), nullable=False),
+    sa.Column('block_hash', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('indexer_checkpoints', if_exists=True)
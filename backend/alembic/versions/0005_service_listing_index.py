@@ -0,0 +1,37 @@
+"""covering index for filtered service listings
+
+Idempotent: databases built by create_all may already have this index.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_services_status_type_rating',
+        'services',
+        ['status', 'service_type', sa.text('rating DESC'), sa.text('id DESC')],
+        unique=False,
+        if_not_exists=True,
+        postgresql_include=['provider_address', 'contract_address', 'name', 'price', 'call_count', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_services_status_type_rating', table_name='services', if_exists=True)
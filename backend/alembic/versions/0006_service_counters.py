@@ -0,0 +1,50 @@
+"""service rating aggregates and per-rater ratings
+
+Idempotent: databases built by create_all may already have these.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    service_columns = {column['name'] for column in inspector.get_columns('services')}
+    if 'rating_sum' not in service_columns:
+        op.add_column('services', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    if 'rating_count' not in service_columns:
+        op.add_column('services', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+    if not inspector.has_table('service_ratings'):
+        op.create_table('service_ratings',
+        sa.Column('service_id', sa.UUID(), nullable=False),
+        sa.Column('rater_address', sa.String(), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('comment', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+        sa.PrimaryKeyConstraint('service_id', 'rater_address')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('service_ratings', if_exists=True)
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
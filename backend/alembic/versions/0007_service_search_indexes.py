@@ -0,0 +1,47 @@
+"""market search indexes (PostgreSQL only)
+
+Full-text GIN index over the weighted name/description document and a
+pg_trgm index on name. Other databases search with LIKE and get nothing.
+Idempotent: databases built by create_all may already have these indexes.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay identical to src.models.service.SEARCH_VECTOR_SQL
+SEARCH_VECTOR_SQL = (
+    "(setweight(to_tsvector('english'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_services_search', 'services', [sa.text(SEARCH_VECTOR_SQL)], unique=False,
+                    postgresql_using='gin', if_not_exists=True)
+    op.create_index('ix_services_name_trgm', 'services', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_services_name_trgm', table_name='services', if_exists=True)
+    op.drop_index('ix_services_search', table_name='services', if_exists=True)
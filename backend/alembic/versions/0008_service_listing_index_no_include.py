@@ -0,0 +1,49 @@
+"""drop INCLUDE columns from ix_services_status_type_rating (PostgreSQL only)
+
+0005 creates the index with INCLUDE columns that never allowed index-only
+scans (listing pages also read description). Rebuilds it as a plain one;
+databases built by create_all never had INCLUDE.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:07
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_services_status_type_rating', table_name='services', if_exists=True)
+    op.create_index(
+        'ix_services_status_type_rating',
+        'services',
+        ['status', 'service_type', sa.text('rating DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_services_status_type_rating', table_name='services', if_exists=True)
+    op.create_index(
+        'ix_services_status_type_rating',
+        'services',
+        ['status', 'service_type', sa.text('rating DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_include=['provider_address', 'contract_address', 'name', 'price', 'call_count', 'created_at'],
+    )
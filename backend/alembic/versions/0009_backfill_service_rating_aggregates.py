@@ -0,0 +1,43 @@
+"""backfill services.rating_sum / rating_count for rated services
+
+Services rated before 0006 have an average but rating_sum = rating_count = 0,
+so the first rating through the API replaced the average. They get
+RATING_PRIOR_WEIGHT ratings' worth of their stored average instead.
+Idempotent: only rows with a rating and no count are touched.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:08
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay identical to src.models.service.RATING_PRIOR_WEIGHT
+RATING_PRIOR_WEIGHT = 10
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        sa.text(
+            'UPDATE services SET rating_count = :weight, '
+            'rating_sum = CAST(ROUND(rating * :weight) AS INTEGER) '
+            'WHERE rating_count = 0 AND rating > 0'
+        ).bindparams(weight=RATING_PRIOR_WEIGHT)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Backfilled aggregates are indistinguishable from real ones; keep them
+    pass
@@ -0,0 +1,57 @@
+"""stored services.search_vector for market search (PostgreSQL only)
+
+ts_rank over the ix_services_search expression re-parsed name and
+description for every matching row. The document is now a stored generated
+column and ix_services_search indexes that column instead. Other databases
+search with LIKE and get nothing. Idempotent: databases built by create_all
+already have the column and index.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:09
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay identical to src.models.service.SEARCH_VECTOR_SQL
+SEARCH_VECTOR_SQL = (
+    "(setweight(to_tsvector('english'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('services')}
+    if 'search_vector' in columns:
+        return
+    op.execute(
+        f'ALTER TABLE services ADD COLUMN search_vector tsvector '
+        f'GENERATED ALWAYS AS {SEARCH_VECTOR_SQL} STORED'
+    )
+    op.drop_index('ix_services_search', table_name='services', if_exists=True)
+    op.create_index('ix_services_search', 'services', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_services_search', table_name='services', if_exists=True)
+    op.drop_column('services', 'search_vector')
+    op.create_index('ix_services_search', 'services', [sa.text(SEARCH_VECTOR_SQL)], unique=False,
+                    postgresql_using='gin')
@@ -0,0 +1,44 @@
+"""recount services.rating_sum / rating_count from service_ratings
+
+0009 stored RATING_PRIOR_WEIGHT ratings' worth of each service's average
+as rating_sum / rating_count, so the first real rating barely moved the
+average and rating_count reported ratings with no service_ratings rows
+behind them. Both columns count service_ratings again; services with
+ratings get their average recomputed from them (truncated to two decimals
+like Market.rateService), the others keep their stored average.
+Idempotent.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:10
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        'UPDATE services SET '
+        'rating_sum = COALESCE((SELECT SUM(r.rating) FROM service_ratings r WHERE r.service_id = services.id), 0), '
+        'rating_count = (SELECT COUNT(*) FROM service_ratings r WHERE r.service_id = services.id)'
+    )
+    op.execute(
+        'UPDATE services SET rating = (rating_sum * 100 / rating_count) * 0.01 '
+        'WHERE rating_count > 0'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The counts 0009 made up are not restored
+    pass
@@ -0,0 +1,135 @@
+"""
+Walk every keyset page of the list endpoints and check each row appears once.
+
+Seeds rows whose sort keys collide: timestamps from the database default
+(many per second, stored without fractional seconds on SQLite) mixed with
+explicit microsecond timestamps, and services sharing the same rating. Then
+follows X-Next-Cursor from the first page to the last at several page sizes:
+
+    python benchmarks/pagination_check.py
+
+Runs in-process against a throwaway SQLite database (set DATABASE_URL to
+check another database; rows already there are walked too).
+Exits non-zero when a page repeats or skips a row, or a walk does not end.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/pagination_check.db"
+os.environ["LISTING_CACHE_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from src.database import engine  # noqa: E402
+from src.main import app  # noqa: E402
+from src.models import Agent, Payment, Service, Transaction, User  # noqa: E402
+from src.startup import create_tables  # noqa: E402
+
+API = "/api/v1"
+PAGE_SIZES = (1, 3, 7, 100)
+ROWS = 120
+AGENT_ID = uuid.uuid4()
+TAG = AGENT_ID.hex[:12]
+
+
+def seed():
+    create_tables()
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user_id, wallet_address=f"0xpc{user_id.hex}"))
+        conn.execute(insert(Agent).values(id=AGENT_ID, user_id=user_id, contract_address=f"0xpc{AGENT_ID.hex}",
+                                          name="Pagination Check"))
+        transaction = {"agent_id": AGENT_ID, "transaction_type": "buy", "token_address": "0x0",
+                       "amount": Decimal(1), "status": "success"}
+        conn.execute(insert(Transaction), [
+            {**transaction, "id": uuid.uuid4(), "tx_hash": f"0xpct{TAG}{i:06d}"} for i in range(ROWS)
+        ])
+        conn.execute(insert(Transaction), [
+            {**transaction, "id": uuid.uuid4(), "tx_hash": f"0xpctus{TAG}{i:06d}",
+             "created_at": now + timedelta(microseconds=i * 250)}
+            for i in range(ROWS // 4)
+        ])
+        # One statement: every row gets the same server-default timestamp
+        conn.execute(insert(Payment), [
+            {"id": uuid.uuid4(), "payment_id": f"pc{TAG}-{i}", "tx_hash": f"0xpc{TAG}{i:06d}",
+             "amount": Decimal(1), "payment_type": "service_call"}
+            for i in range(ROWS)
+        ])
+        conn.execute(insert(Payment), [
+            {"id": uuid.uuid4(), "payment_id": f"pc{TAG}-us-{i}", "tx_hash": f"0xpcus{TAG}{i:06d}",
+             "amount": Decimal(1), "payment_type": "service_call",
+             "created_at": now + timedelta(microseconds=i * 250)}
+            for i in range(ROWS // 4)
+        ])
+        conn.execute(insert(Service), [
+            {"id": uuid.uuid4(), "provider_address": f"0xpc{i}", "contract_address": f"0xpcs{TAG}{i}",
+             "name": f"Service {i}", "service_type": "other", "price": Decimal(1),
+             "rating": Decimal("4.50") if i % 2 else Decimal("3.00"), "status": "active"}
+            for i in range(ROWS)
+        ])
+
+
+async def walk(client, path: str, limit: int, expected: set) -> list:
+    """Problems found following the cursor from the first page"""
+    seen, cursor = [], None
+    for _ in range(len(expected) + 2):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"{API}/{path}", params=params)
+        response.raise_for_status()
+        seen += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    else:
+        return [f"{path} limit={limit}: no last page after {len(expected) + 2} pages"]
+
+    problems = []
+    repeated = len(seen) - len(set(seen))
+    if repeated:
+        problems.append(f"{path} limit={limit}: {repeated} rows repeated")
+    missing = expected - set(seen)
+    if missing:
+        problems.append(f"{path} limit={limit}: {len(missing)} rows skipped")
+    return problems
+
+
+async def main():
+    seed()
+    with engine.connect() as conn:
+        walks = {
+            "payments": {str(i) for i in conn.execute(select(Payment.id)).scalars()},
+            "services": {str(i) for i in conn.execute(select(Service.id).where(Service.status == "active")).scalars()},
+            "market/services": {
+                str(i) for i in conn.execute(select(Service.id).where(Service.status == "active")).scalars()
+            },
+            f"agents/{AGENT_ID}/transactions": {
+                str(i) for i in conn.execute(select(Transaction.id).where(Transaction.agent_id == AGENT_ID)).scalars()
+            },
+        }
+
+    problems = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for path, expected in walks.items():
+            for limit in PAGE_SIZES:
+                problems += await walk(client, path, limit, expected)
+            print(f"{path}: {len(expected)} rows, page sizes {', '.join(map(str, PAGE_SIZES))}")
+
+    if problems:
+        print("❌ " + "\n❌ ".join(problems), file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ Every page walk returned each row exactly once ({len(walks)} endpoints)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
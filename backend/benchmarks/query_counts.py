@@ -0,0 +1,182 @@
+"""
+Per-request database round trips for the API endpoints.
+
+Runs the app in-process (httpx ASGITransport) and counts the SQL statements
+and commits each request issues:
+
+    python benchmarks/query_counts.py            # throwaway SQLite database
+    DATABASE_URL=postgresql://... python benchmarks/query_counts.py
+    python benchmarks/query_counts.py --check    # fail on any change from EXPECTED_STATEMENTS
+
+Prints one JSON object per scenario. With --check it exits non-zero when a
+scenario issues a different number of statements than expected, which
+catches N+1 regressions (and stale expectations after an improvement).
+The listing cache is disabled so every request reaches the database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/query_counts.db"
+os.environ["LISTING_CACHE_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from src.database import AsyncSessionLocal, async_engine  # noqa: E402
+from src.main import app  # noqa: E402
+from src.services.x402_payment import X402PaymentService  # noqa: E402
+from src.startup import create_tables  # noqa: E402
+
+API = "/api/v1"
+
+# SQL statements per scenario (commits are not statements)
+EXPECTED_STATEMENTS = {
+    "POST /users (new)": 1,
+    "POST /users (existing)": 2,
+    "POST /agents (new user)": 2,
+    "POST /services (new)": 1,
+    "POST /payments/batch (100 items)": 2,
+    "GET /users/{wallet_address}": 1,
+    "GET /users/{wallet_address}/agents": 1,
+    "GET /agents/{agent_id}": 1,
+    "GET /agents/{agent_id}/stats": 1,
+    "GET /agents/{agent_id}/transactions": 2,
+    "GET /services": 1,
+    "GET /services/{service_id}": 1,
+    "GET /market/services": 1,
+    "GET /market/services/search": 1,
+    "GET /market/services/{service_id}": 1,
+    "GET /payments": 1,
+    "GET /payments/{payment_id}": 1,
+    "X402PaymentService.record_payment": 1,
+}
+
+
+class QueryCounter:
+    """Counts statements and commits on an (async) engine while active"""
+
+    def __init__(self, engine):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.statements = []
+        self.commits = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    @contextmanager
+    def count(self):
+        self.statements, self.commits = [], 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        event.listen(self.engine, "commit", self._on_commit)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._on_execute)
+            event.remove(self.engine, "commit", self._on_commit)
+
+    def report(self, scenario: str) -> dict:
+        return {
+            "scenario": scenario,
+            "statements": len(self.statements),
+            "commits": self.commits,
+            "round_trips": len(self.statements) + self.commits,
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a count differs from EXPECTED_STATEMENTS")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    create_tables()
+    counter = QueryCounter(async_engine)
+    tag = uuid.uuid4().hex[:12]
+    wallet = f"0xqc{tag}"
+    requests = [
+        ("POST /users (new)", "users", {"wallet_address": wallet}),
+        ("POST /users (existing)", "users", {"wallet_address": wallet}),
+        ("POST /agents (new user)", "agents",
+         {"user_wallet_address": f"0xqcu{tag}", "contract_address": f"0xqca{tag}", "name": "QC Agent"}),
+        ("POST /services (new)", "services",
+         {"provider_address": wallet, "contract_address": f"0xqcs{tag}", "name": "QC Service",
+          "service_type": "other", "price": "1.0"}),
+        ("POST /payments/batch (100 items)", "payments/batch",
+         {"payments": [
+             {"payment_id": f"qc{tag}-{i}", "tx_hash": f"0xqc{tag}{i:04d}", "amount": "1", "payment_type": "service_call"}
+             for i in range(100)
+         ]}),
+    ]
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        created = {}
+        for scenario, path, body in requests:
+            with counter.count():
+                response = await client.post(f"{API}/{path}", json=body)
+            response.raise_for_status()
+            created[path] = response.json()
+            results.append(counter.report(scenario))
+
+        agent_id = created["agents"]["id"]
+        service_id = created["services"]["id"]
+        reads = [
+            ("GET /users/{wallet_address}", f"users/{wallet}"),
+            ("GET /users/{wallet_address}/agents", f"users/0xqcu{tag}/agents"),
+            ("GET /agents/{agent_id}", f"agents/{agent_id}"),
+            ("GET /agents/{agent_id}/stats", f"agents/{agent_id}/stats"),
+            ("GET /agents/{agent_id}/transactions", f"agents/{agent_id}/transactions"),
+            ("GET /services", "services"),
+            ("GET /services/{service_id}", f"services/{service_id}"),
+            ("GET /market/services", "market/services"),
+            ("GET /market/services/search", "market/services/search?q=qc"),
+            ("GET /market/services/{service_id}", f"market/services/{service_id}"),
+            ("GET /payments", "payments"),
+            ("GET /payments/{payment_id}", f"payments/qc{tag}-0"),
+        ]
+        for scenario, path in reads:
+            with counter.count():
+                response = await client.get(f"{API}/{path}")
+            response.raise_for_status()
+            results.append(counter.report(scenario))
+
+    async with AsyncSessionLocal() as db:
+        with counter.count():
+            await X402PaymentService().record_payment(
+                payment_id=f"qc{tag}-single", tx_hash=f"0xqc{tag}single", amount="1",
+                payment_type="service_call", db=db
+            )
+        results.append(counter.report("X402PaymentService.record_payment"))
+
+    mismatches = []
+    for result in results:
+        expected = EXPECTED_STATEMENTS.get(result["scenario"])
+        if expected is not None and result["statements"] != expected:
+            result["expected_statements"] = expected
+            mismatches.append(result["scenario"])
+        print(json.dumps(result))
+
+    if args.check:
+        if mismatches:
+            print(f"❌ Statement counts changed: {', '.join(mismatches)}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ Statement counts match for {len(results)} scenarios", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""
+Check BlockchainService's JSON-RPC batching against a local stub node.
+
+Starts a JSON-RPC server on 127.0.0.1 that answers every batch in shuffled
+order and knows only some transaction hashes, points the service at it and
+checks:
+
+- rpc_batch splits calls into requests of at most RPC_BATCH_SIZE calls
+- results come back in call order although the responses are shuffled
+- get_transactions maps unknown hashes to None and unmined ones to status None
+- allow_errors turns a failed call into None instead of failing the batch
+
+    python benchmarks/rpc_batch_check.py
+
+Exits non-zero on the first mismatch. No node, database or network needed.
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+BATCH_SIZE = 40
+os.environ["RPC_BATCH_SIZE"] = str(BATCH_SIZE)
+
+from src.services.blockchain import BlockchainRPCError, BlockchainService  # noqa: E402
+
+HASHES = ["0x%064x" % i for i in range(1, 251)]
+
+
+def tx_kind(tx_hash: str) -> str:
+    """Known and mined, known but not yet mined, or unknown to the node"""
+    return ("mined", "pending", "unknown")[int(tx_hash, 16) % 3]
+
+
+class StubNode(BaseHTTPRequestHandler):
+    """Answers batches in shuffled order and records each request's size"""
+
+    batch_sizes = []
+    rng = random.Random(402)
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.batch_sizes.append(len(body))
+        responses = [self.answer(call) for call in body]
+        self.rng.shuffle(responses)
+        data = json.dumps(responses).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def answer(self, call: dict) -> dict:
+        method, params = call["method"], call["params"]
+        if method == "eth_getBalance":
+            result = hex(int(params[0], 16) * 10)
+        elif method in ("eth_getTransactionByHash", "eth_getTransactionReceipt"):
+            result = self.transaction(method, params[0])
+        else:
+            return {"jsonrpc": "2.0", "id": call["id"], "error": {"code": -32601, "message": "method not found"}}
+        return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+
+    @staticmethod
+    def transaction(method: str, tx_hash: str):
+        kind = tx_kind(tx_hash)
+        if kind == "unknown" or (kind == "pending" and method == "eth_getTransactionReceipt"):
+            return None
+        number = int(tx_hash, 16)
+        if method == "eth_getTransactionByHash":
+            return {"hash": tx_hash, "from": "0x" + "11" * 20, "to": "0x" + "22" * 20, "value": hex(number)}
+        return {"transactionHash": tx_hash, "status": "0x1", "blockNumber": hex(1000 + number), "gasUsed": "0x5208"}
+
+
+def expect(problems: list, condition: bool, message: str):
+    if not condition:
+        problems.append(message)
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubNode)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    blockchain = BlockchainService(rpc_url=f"http://127.0.0.1:{server.server_address[1]}")
+    problems = []
+    try:
+        # Chunking: 2 calls per hash
+        calls = 2 * len(HASHES)
+        transactions = await blockchain.get_transactions(HASHES)
+        expected_sizes = [BATCH_SIZE] * (calls // BATCH_SIZE) + ([calls % BATCH_SIZE] if calls % BATCH_SIZE else [])
+        expect(problems, sorted(StubNode.batch_sizes, reverse=True) == expected_sizes,
+               f"get_transactions: batch sizes {StubNode.batch_sizes}, expected {expected_sizes}")
+        print(f"get_transactions: {calls} calls in {len(StubNode.batch_sizes)} batches of <= {BATCH_SIZE}")
+
+        # Shuffled responses still land on the right hash; unknown -> None
+        for tx_hash in HASHES:
+            tx, kind = transactions.get(tx_hash), tx_kind(tx_hash)
+            if kind == "unknown":
+                expect(problems, tx is None, f"{tx_hash}: unknown transaction returned {tx}")
+            elif tx is None or tx["value"] != int(tx_hash, 16):
+                problems.append(f"{tx_hash}: got {tx}, responses were matched to the wrong call")
+            elif kind == "pending":
+                expect(problems, tx["status"] is None and tx["block_number"] is None,
+                       f"{tx_hash}: unmined transaction returned status {tx['status']}")
+            else:
+                expect(problems, tx["status"] == 1 and tx["block_number"] == 1000 + int(tx_hash, 16),
+                       f"{tx_hash}: receipt mismatch {tx}")
+        expect(problems, list(transactions) == HASHES, "get_transactions: keys not in input order")
+
+        addresses = ["0x%040x" % i for i in range(1, 101)]
+        balances = await blockchain.get_balances(addresses)
+        expect(problems, all(balances[a] == int(a, 16) * 10 for a in addresses), "get_balances: results out of order")
+
+        # One failing call: None with allow_errors, BlockchainRPCError without
+        mixed = [("eth_getBalance", [addresses[0], "latest"]), ("eth_unsupported", []),
+                 ("eth_getBalance", [addresses[1], "latest"])]
+        results = await blockchain.rpc_batch(mixed, allow_errors=True)
+        expect(problems, results == [hex(10), None, hex(20)], f"rpc_batch(allow_errors=True): {results}")
+        try:
+            await blockchain.rpc_batch(mixed)
+            problems.append("rpc_batch: a failed call did not raise BlockchainRPCError")
+        except BlockchainRPCError:
+            pass
+    finally:
+        await blockchain.close()
+        server.shutdown()
+
+    if problems:
+        print("❌ " + "\n❌ ".join(problems[:20]), file=sys.stderr)
+        sys.exit(1)
+    print("✅ RPC batching: chunk sizes, response order, unknown transactions and call errors as expected",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
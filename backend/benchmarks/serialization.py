@@ -0,0 +1,133 @@
+"""
+Per-item cost of building a 1k-row list response.
+
+Compares the previous path (ORM entities -> per-field ServiceResponse ->
+response_model validation -> jsonable_encoder -> json.dumps) with the
+current one (column select() -> row dicts -> orjson), split into fetch and
+encode steps:
+
+    python benchmarks/serialization.py --rows 1000 --repeat 20
+
+Runs against a throwaway SQLite database; prints JSON with microseconds
+per item (median over repeats).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/serialization.db"
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from src.database import Base, SessionLocal, engine  # noqa: E402
+from src.models import Service  # noqa: E402
+from src.routes.services import SERVICE_COLUMNS, SERVICE_KEYS, ServiceResponse  # noqa: E402
+from src.serialization import dumps, row_dicts  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions (median reported)")
+    return parser.parse_args()
+
+
+def seed(rows: int):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Service), [
+            {
+                "id": uuid.uuid4(),
+                "provider_address": f"0x{i:040x}",
+                "contract_address": f"0x{10**6 + i:040x}",
+                "name": f"Service {i}",
+                "description": "Benchmark service with a description of typical length",
+                "service_type": "strategy",
+                "price": Decimal("12.5"),
+                "pricing_model": "pay_per_use",
+                "rating": Decimal("4.20"),
+                "call_count": i,
+                "status": "active",
+            }
+            for i in range(rows)
+        ])
+
+
+def median_us_per_item(fn, rows: int, repeat: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) / rows * 1e6, 3)
+
+
+def main():
+    args = parse_args()
+    seed(args.rows)
+    db = SessionLocal()
+    entity_query = select(Service).limit(args.rows)
+    column_query = select(*SERVICE_COLUMNS).limit(args.rows)
+    adapter = TypeAdapter(list[ServiceResponse])
+
+    def fetch_entities():
+        db.expunge_all()
+        return db.execute(entity_query).scalars().all()
+
+    def fetch_columns():
+        return db.execute(column_query).all()
+
+    entities = fetch_entities()
+    rows = fetch_columns()
+
+    def encode_pydantic():
+        items = [
+            ServiceResponse(
+                id=str(s.id),
+                provider_address=s.provider_address,
+                contract_address=s.contract_address,
+                name=s.name,
+                description=s.description,
+                service_type=s.service_type,
+                price=str(s.price),
+                rating=str(s.rating),
+                call_count=s.call_count,
+                status=s.status,
+                created_at=s.created_at.isoformat()
+            ).model_dump()
+            for s in entities
+        ]
+        # What FastAPI does with a returned list and response_model
+        validated = adapter.validate_python(items)
+        return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+    def encode_orjson():
+        return dumps(row_dicts(rows, SERVICE_KEYS))
+
+    results = {
+        "rows": args.rows,
+        "fetch_orm_entities_us": median_us_per_item(fetch_entities, args.rows, args.repeat),
+        "fetch_columns_us": median_us_per_item(fetch_columns, args.rows, args.repeat),
+        "encode_pydantic_json_us": median_us_per_item(encode_pydantic, args.rows, args.repeat),
+        "encode_rows_orjson_us": median_us_per_item(encode_orjson, args.rows, args.repeat),
+    }
+    results["before_total_us"] = round(results["fetch_orm_entities_us"] + results["encode_pydantic_json_us"], 3)
+    results["after_total_us"] = round(results["fetch_columns_us"] + results["encode_rows_orjson_us"], 3)
+    results["speedup"] = round(results["before_total_us"] / results["after_total_us"], 2)
+    print(json.dumps(results, indent=2))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
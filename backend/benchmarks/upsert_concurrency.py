@@ -0,0 +1,92 @@
+"""
+Concurrent get-or-create load test.
+
+Fires many simultaneous POST /users, /agents and /services requests that
+share one wallet/contract address and checks that every request succeeds
+and that all of them got the same row back.
+
+    python benchmarks/upsert_concurrency.py --url http://localhost:8000 --concurrency 200
+
+Exits non-zero when any request fails or returns a different row.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+import httpx
+
+API = "/api/v1"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--concurrency", type=int, default=100, help="Simultaneous requests per endpoint")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds, each with fresh addresses")
+    return parser.parse_args()
+
+
+def payloads(tag: str):
+    wallet = f"0xload{tag}"
+    return {
+        "users": {"wallet_address": wallet},
+        "agents": {"user_wallet_address": wallet, "contract_address": f"0xagent{tag}", "name": "Load Agent"},
+        "services": {
+            "provider_address": wallet,
+            "contract_address": f"0xservice{tag}",
+            "name": "Load Service",
+            "service_type": "other",
+            "price": "1.0",
+        },
+    }
+
+
+async def hammer(client: httpx.AsyncClient, path: str, body: dict, concurrency: int) -> dict:
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.post(f"{API}/{path}", json=body) for _ in range(concurrency)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    errors, ids = [], set()
+    for response in responses:
+        if isinstance(response, Exception):
+            errors.append(repr(response))
+        elif response.status_code != 200:
+            errors.append(f"{response.status_code}: {response.text[:200]}")
+        else:
+            ids.add(response.json()["id"])
+    return {
+        "endpoint": f"POST {API}/{path}",
+        "requests": concurrency,
+        "errors": len(errors),
+        "distinct_ids": len(ids),
+        "seconds": round(elapsed, 3),
+        "sample_errors": errors[:3],
+    }
+
+
+async def main():
+    args = parse_args()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        for _ in range(args.rounds):
+            tag = uuid.uuid4().hex[:12]
+            for path, body in payloads(tag).items():
+                results.append(await hammer(client, path, body, args.concurrency))
+
+    print(json.dumps(results, indent=2))
+    failed = [r for r in results if r["errors"] or r["distinct_ids"] != 1]
+    if failed:
+        print(f"❌ {len(failed)} endpoint runs had errors or duplicate rows", file=sys.stderr)
+        sys.exit(1)
+    print("✅ No errors; every request got the same row", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
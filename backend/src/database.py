@@ -1,7 +1,15 @@
 """Database configuration"""
-from sqlalchemy import create_engine
+import time
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from src.config import settings
 
@@ -18,17 +26,149 @@ if database_url.startswith("postgresql://") and "psycopg" not in database_url:
         # psycopg3 not installed, use default (psycopg2)
         pass
 
-engine = create_engine(database_url)
+# The async engine needs an asyncio-capable driver. psycopg3 serves both the
+# sync and async engines under the same dialect name; SQLite goes through aiosqlite.
+async_database_url = database_url
+if async_database_url.startswith("postgresql://"):
+    async_database_url = async_database_url.replace("postgresql://", "postgresql+psycopg://", 1)
+elif async_database_url.startswith("sqlite://"):
+    async_database_url = async_database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+
+class PoolWaitStats:
+    """Accumulated time spent waiting for a pooled connection"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if timed_out:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+            "avg_wait_ms": round(self.total_wait * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class _TimedPoolMixin:
+    """Times every checkout, including the wait for a free slot under load"""
+
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return conn
+
+
+# One class per engine: the pool class is re-instantiated on engine.dispose(),
+# so the stats live on the class to survive that.
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+def _pool_options(url: str, poolclass) -> Dict[str, Any]:
+    """Pool settings from config; SQLite keeps SQLAlchemy's default pool"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Sync engine: used by scripts (init_db.py, check_data.py) and startup tasks
+engine = create_engine(database_url, **_pool_options(database_url, TimedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Async engine: used by the request handlers so DB waits don't block the event loop
+async_engine = create_async_engine(
+    async_database_url, **_pool_options(async_database_url, TimedAsyncQueuePool)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
+class _ModelDefaults:
+    # Server-generated columns (created_at, updated_at) come back in the
+    # INSERT/UPDATE itself via RETURNING instead of a refresh() round trip
+    __mapper_args__ = {"eager_defaults": True}
 
-def get_db():
-    """Get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
+Base = declarative_base(cls=_ModelDefaults)
+
+
+def dialect_insert(model):
+    """INSERT that supports ON CONFLICT clauses on the configured database"""
+    if engine.dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return pg_insert(model)
+
+
+async def insert_or_get(db: AsyncSession, model, key: str, **values):
+    """Get-or-create by a unique column; returns the new or existing row
+
+    INSERT ... ON CONFLICT (key) DO NOTHING RETURNING * creates the row in
+    one statement. On conflict nothing is written or locked (a no-op DO
+    UPDATE would leave a dead tuple and take a row lock), and the existing
+    row is read with a SELECT instead. Concurrent callers with the same key
+    all get the same row and none fail.
+    """
+    result = await db.execute(
+        dialect_insert(model).values(**values).on_conflict_do_nothing(index_elements=[key]).returning(model)
+    )
+    row = result.scalar_one_or_none()
+    if row is None:
+        result = await db.execute(select(model).where(getattr(model, key) == values[key]))
+        row = result.scalar_one()
+    return row
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Connection pool counters for an engine (sync or async)"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.snapshot()
+    return status
+
+
+async def get_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,88 @@
+"""Conditional GET (ETag / Last-Modified -> 304) and Cache-Control for detail endpoints
+
+Handlers derive validators from a row's id and version (updated_at, or the
+status of a payment) and call not_modified() before building the response
+body: a client or CDN holding the current version gets an empty 304.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.config import settings
+
+# Bump when a detail response body changes shape, so cached copies are refetched
+ETAG_VERSION = "1"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag for one version of a resource, e.g. make_etag(service.id, service.updated_at)"""
+    raw = "|".join([ETAG_VERSION, *(p.isoformat() if isinstance(p, datetime) else str(p) for p in parts)])
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; CURRENT_TIMESTAMP is UTC there
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: Optional[int] = None
+) -> Dict[str, str]:
+    """Validator and Cache-Control headers for a detail response
+
+    Responses may be reused for `max_age` seconds (default
+    HTTP_CACHE_MAX_AGE) and are revalidated after that, every time when it
+    is 0.
+    """
+    if max_age is None:
+        max_age = settings.HTTP_CACHE_MAX_AGE
+    if max_age > 0:
+        cache_control = f"public, max-age={max_age}"
+    else:
+        cache_control = "no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): opaque tags compared without W/
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: str) -> bool:
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """An empty 304 when the client's copy matches `headers`, otherwise None
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    without it (and only when the response has a Last-Modified).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = (
+            if_modified_since is not None
+            and "Last-Modified" in headers
+            and _not_modified_since(if_modified_since, headers["Last-Modified"])
+        )
+    return Response(status_code=304, headers=headers) if fresh else None
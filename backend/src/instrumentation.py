@@ -0,0 +1,166 @@
+"""
+Per-request query and RPC instrumentation.
+
+With METRICS_ENABLED, every HTTP request gets a RequestStats in a context
+variable. SQLAlchemy cursor events and BlockchainService calls add to it,
+and InstrumentationMiddleware turns it into a `Server-Timing` header and
+Prometheus metrics labelled by route template (served at /metrics).
+
+Work outside a request (background workers, Celery tasks) is not counted.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+except ImportError:  # prometheus_client is optional; Server-Timing still works without it
+    Counter = Histogram = None
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+@dataclass
+class RequestStats:
+    """SQL and RPC work done while handling one request"""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    rpc_calls: int = 0
+    rpc_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside one (or when disabled)"""
+    return _request_stats.get()
+
+
+def record_rpc(started: float, calls: int = 1):
+    """Count one RPC round trip started at `started` (time.perf_counter())"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.rpc_calls += calls
+        stats.rpc_seconds += time.perf_counter() - started
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """Count statements and DB time per request (pass AsyncEngine.sync_engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+if Histogram is not None:
+    REQUEST_DURATION = Histogram(
+        "x402_http_request_duration_seconds", "Request latency", ["method", "route", "status"]
+    )
+    REQUEST_DB_QUERIES = Histogram(
+        "x402_http_request_db_queries", "SQL statements per request", ["method", "route"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+    )
+    REQUEST_DB_SECONDS = Counter(
+        "x402_http_request_db_seconds", "Time spent in SQL statements", ["method", "route"]
+    )
+    REQUEST_RPC_CALLS = Histogram(
+        "x402_http_request_rpc_calls", "RPC round trips per request", ["method", "route"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50)
+    )
+    REQUEST_RPC_SECONDS = Counter(
+        "x402_http_request_rpc_seconds", "Time spent in RPC calls", ["method", "route"]
+    )
+
+
+def _observe(method: str, route: str, status: int, stats: RequestStats, elapsed: float):
+    if Histogram is None:
+        return
+    REQUEST_DURATION.labels(method, route, str(status)).observe(elapsed)
+    REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+    REQUEST_DB_SECONDS.labels(method, route).inc(stats.db_seconds)
+    REQUEST_RPC_CALLS.labels(method, route).observe(stats.rpc_calls)
+    REQUEST_RPC_SECONDS.labels(method, route).inc(stats.rpc_seconds)
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> bytes:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries", '
+        f'rpc;dur={stats.rpc_seconds * 1000:.1f};desc="{stats.rpc_calls} calls", '
+        f'total;dur={elapsed * 1000:.1f}'
+    ).encode()
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware: Server-Timing header, per-route metrics and /metrics
+
+    The header is written when the response starts, so for streamed
+    responses it covers the work before the first chunk; the metrics are
+    recorded once the body has been sent.
+    """
+
+    def __init__(self, app, metrics_path: str = "/metrics"):
+        self.app = app
+        self.metrics_path = metrics_path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] == self.metrics_path and Histogram is not None:
+            await self._send_metrics(send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER.encode(), _server_timing(stats, time.perf_counter() - started)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            _observe(scope["method"], route, status, stats, time.perf_counter() - started)
+
+    async def _send_metrics(self, send):
+        body = generate_latest()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", CONTENT_TYPE_LATEST.encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -2,8 +2,10 @@
 from src.models.user import User
 from src.models.agent import Agent
 from src.models.service import Service
+from src.models.service_rating import ServiceRating
 from src.models.transaction import Transaction
 from src.models.payment import Payment
+from src.models.indexer_checkpoint import IndexerCheckpoint
 
-__all__ = ["User", "Agent", "Service", "Transaction", "Payment"]
+__all__ = ["User", "Agent", "Service", "ServiceRating", "Transaction", "Payment", "IndexerCheckpoint"]
 
@@ -23,8 +23,8 @@ class Agent(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="agents")
-    transactions = relationship("Transaction", back_populates="agent")
+    user = relationship("User", back_populates="agents", lazy="raise_on_sql")
+    transactions = relationship("Transaction", back_populates="agent", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Agent(id={self.id}, name={self.name}, contract_address={self.contract_address})>"
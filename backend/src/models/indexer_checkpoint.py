@@ -0,0 +1,18 @@
+"""Indexer checkpoint model"""
+from sqlalchemy import Column, String, Numeric, DateTime
+from sqlalchemy.sql import func
+
+from src.database import Base
+
+
+class IndexerCheckpoint(Base):
+    """Last block an event indexer has fully ingested"""
+    __tablename__ = "indexer_checkpoints"
+
+    name = Column(String, primary_key=True)
+    block_number = Column(Numeric(20, 0), nullable=False)
+    block_hash = Column(String)  # Detects reorgs below the confirmation depth
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IndexerCheckpoint(name={self.name}, block_number={self.block_number})>"
@@ -1,5 +1,5 @@
 """Payment model"""
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,12 @@ from src.database import Base
 class Payment(Base):
     """Payment model"""
     __tablename__ = "payments"
+    __table_args__ = (
+        # Keyset pagination over (created_at, id)
+        Index("ix_payments_created_at_id", "created_at", "id"),
+        # Payment confirmation worker pages through pending payments by id
+        Index("ix_payments_status_id", "status", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=True)
@@ -25,7 +31,7 @@ class Payment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    service = relationship("Service", back_populates="payments")
+    service = relationship("Service", back_populates="payments", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Payment(id={self.id}, payment_id={self.payment_id}, amount={self.amount})>"
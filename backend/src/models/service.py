@@ -1,5 +1,5 @@
 """Service model"""
-from sqlalchemy import Column, String, Numeric, Integer, DateTime
+from sqlalchemy import Column, String, Numeric, Integer, DateTime, Index, DDL, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -7,10 +7,34 @@ import uuid
 
 from src.database import Base
 
+# Weighted document for market search (PostgreSQL), stored in the generated
+# column services.search_vector so ranking reads it instead of re-parsing
+# name and description for every match. The column is PostgreSQL-only and
+# not mapped: other databases have no tsvector, and listings never load it.
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_SQL = (
+    "(setweight(to_tsvector('english'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B'))"
+)
+
 
 class Service(Base):
     """Service model"""
     __tablename__ = "services"
+    __table_args__ = (
+        # Keyset pagination of active listings over (rating, id)
+        Index("ix_services_status_rating_id", "status", "rating", "id"),
+        # Listings filtered by type, in the same (rating, id) DESC order. No
+        # INCLUDE columns: pages also return description, which can exceed
+        # the B-tree tuple size, so rows are read from the heap either way
+        Index("ix_services_status_type_rating", "status", "service_type", text("rating DESC"), text("id DESC")),
+        # Market search (ix_services_search on search_vector is created with
+        # the column below); other databases fall back to LIKE and skip these.
+        # Fuzzy (misspelled) name matches:
+        Index(
+            "ix_services_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     provider_address = Column(String, index=True, nullable=False)
@@ -20,15 +44,39 @@ class Service(Base):
     service_type = Column(String, nullable=False)  # strategy, risk_control, data_source, other
     price = Column(Numeric(36, 18), nullable=False)
     pricing_model = Column(String, default="pay_per_use")  # pay_per_use, subscription
-    rating = Column(Numeric(3, 2), default=0)  # Average rating (0-5)
+    rating = Column(Numeric(3, 2), default=0)  # Average rating (0-5), rating_sum / rating_count
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")  # Sum of current 1-5 ratings
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
     call_count = Column(Integer, default=0)
     status = Column(String, default="active")  # active, paused, delisted
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    payments = relationship("Payment", back_populates="service")
+    payments = relationship("Payment", back_populates="service", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Service(id={self.id}, name={self.name}, contract_address={self.contract_address})>"
 
+
+# gin_trgm_ops comes from the pg_trgm extension
+event.listen(
+    Service.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Service.__table__,
+    "after_create",
+    DDL(
+        f"ALTER TABLE %(table)s ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector "
+        f"GENERATED ALWAYS AS {SEARCH_VECTOR_SQL} STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Service.__table__,
+    "after_create",
+    DDL(f"CREATE INDEX ix_services_search ON %(table)s USING gin ({SEARCH_VECTOR_COLUMN})").execute_if(
+        dialect="postgresql"
+    ),
+)
@@ -0,0 +1,25 @@
+"""Service rating model"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from src.database import Base
+
+
+class ServiceRating(Base):
+    """A rater's current rating of a service (Market.userRatings)
+
+    Rating again replaces the previous value, so services.rating_sum /
+    rating_count can be adjusted by the difference instead of re-summing.
+    """
+    __tablename__ = "service_ratings"
+
+    service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), primary_key=True)
+    rater_address = Column(String, primary_key=True)
+    rating = Column(Integer, nullable=False)  # 1-5
+    comment = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ServiceRating(service_id={self.service_id}, rater_address={self.rater_address}, rating={self.rating})>"
@@ -1,5 +1,5 @@
 """Transaction model"""
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,10 @@ from src.database import Base
 class Transaction(Base):
     """Transaction model"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Per-agent history in (created_at, id) order; also serves the stats aggregate
+        Index("ix_transactions_agent_id_created_at_id", "agent_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=False)
@@ -24,7 +28,7 @@ class Transaction(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    agent = relationship("Agent", back_populates="transactions")
+    agent = relationship("Agent", back_populates="transactions", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Transaction(id={self.id}, tx_hash={self.tx_hash}, type={self.transaction_type})>"
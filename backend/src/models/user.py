@@ -17,8 +17,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Relationships
-    agents = relationship("Agent", back_populates="user")
+    # Relationships (never lazy loaded; pick a loader option per query)
+    agents = relationship("Agent", back_populates="user", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<User(id={self.id}, wallet_address={self.wallet_address})>"
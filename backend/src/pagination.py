@@ -0,0 +1,85 @@
+"""Keyset (cursor) pagination helpers"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, bindparam, func, tuple_
+
+from src.database import engine
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# SQLite keeps timestamps as text: server defaults (CURRENT_TIMESTAMP) are
+# 'YYYY-MM-DD HH:MM:SS' while bound datetimes carry '.ffffff', so a cursor
+# would sort after every row of its own second and the same page comes back
+# forever. There, timestamp sort keys are compared and ordered in one format
+# (millisecond precision, ties broken by the next key).
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%f"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else str(v) for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[str], Any]) -> tuple:
+    """Decode a cursor back into its typed sort key values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor arity mismatch")
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def next_cursor(items: Sequence[dict], limit: int, *fields: str) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this was the last page"""
+    if limit <= 0 or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(*(last[field] for field in fields))
+
+
+def set_next_cursor(response, items: List[dict], limit: int, *fields: str):
+    """Expose the next page cursor as a response header, keeping list bodies unchanged"""
+    cursor = next_cursor(items, limit, *fields)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+def _normalized(column) -> bool:
+    return engine.dialect.name == "sqlite" and isinstance(column.type, DateTime)
+
+
+def sort_key(column):
+    """`column` as keyset pages (and range filters on it) compare and order it"""
+    if _normalized(column):
+        return func.strftime(SQLITE_TIMESTAMP_FORMAT, column)
+    return column
+
+
+def sort_value(column, value: Any):
+    """A bound `value` comparable with sort_key(column)"""
+    if _normalized(column):
+        return func.strftime(SQLITE_TIMESTAMP_FORMAT, bindparam(None, value, type_=column.type))
+    return value
+
+
+def keyset_order(*columns) -> list:
+    """ORDER BY clauses for a descending keyset over `columns`"""
+    return [sort_key(column).desc() for column in columns]
+
+
+def keyset_before(columns: Sequence, values: Sequence[Any]):
+    """Rows after a decoded cursor in keyset_order(*columns)"""
+    return tuple_(*(sort_key(column) for column in columns)) < tuple_(
+        *(sort_value(column, value) for column, value in zip(columns, values))
+    )
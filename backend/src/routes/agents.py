@@ -1,15 +1,27 @@
 """Agent routes"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 
-from src.database import get_db
+from src.database import get_db, insert_or_get, AsyncSessionLocal
+from src.http_cache import cache_headers, make_etag, not_modified
+from src.pagination import decode_cursor, keyset_before, keyset_order, set_next_cursor, sort_key, sort_value
+from src.serialization import ORJSONResponse, dumps, row_dicts
 from src.models.agent import Agent
+from src.models.transaction import Transaction
 from src.models.user import User
 
 router = APIRouter()
 
+# Rows fetched per round trip when streaming a transaction export
+EXPORT_YIELD_PER = 1000
+
 
 class AgentCreate(BaseModel):
     user_wallet_address: str
@@ -33,66 +45,22 @@ class AgentResponse(BaseModel):
 
 
 @router.post("/agents", response_model=AgentResponse)
-async def create_agent(agent_data: AgentCreate, db: Session = Depends(get_db)):
-    """Create a new agent"""
+async def create_agent(agent_data: AgentCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new agent (returns the existing one for a known contract address)"""
     # Get or create user
-    user = db.query(User).filter(
-        User.wallet_address == agent_data.user_wallet_address
-    ).first()
-    
-    if not user:
-        user = User(wallet_address=agent_data.user_wallet_address)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    
-    # Check if agent already exists
-    existing_agent = db.query(Agent).filter(
-        Agent.contract_address == agent_data.contract_address
-    ).first()
-    
-    if existing_agent:
-        return AgentResponse(
-            id=str(existing_agent.id),
-            user_id=str(existing_agent.user_id),
-            contract_address=existing_agent.contract_address,
-            name=existing_agent.name,
-            description=existing_agent.description,
-            balance=str(existing_agent.balance),
-            status=existing_agent.status,
-            created_at=existing_agent.created_at.isoformat()
-        )
+    user = await insert_or_get(db, User, "wallet_address", wallet_address=agent_data.user_wallet_address)
     
-    # Create new agent
-    new_agent = Agent(
+    # Get or create agent; an existing agent is returned unchanged
+    agent = await insert_or_get(
+        db,
+        Agent,
+        "contract_address",
         user_id=user.id,
         contract_address=agent_data.contract_address,
         name=agent_data.name,
         description=agent_data.description
     )
-    db.add(new_agent)
-    db.commit()
-    db.refresh(new_agent)
-    
-    return AgentResponse(
-        id=str(new_agent.id),
-        user_id=str(new_agent.user_id),
-        contract_address=new_agent.contract_address,
-        name=new_agent.name,
-        description=new_agent.description,
-        balance=str(new_agent.balance),
-        status=new_agent.status,
-        created_at=new_agent.created_at.isoformat()
-    )
-
-
-@router.get("/agents/{agent_id}", response_model=AgentResponse)
-async def get_agent(agent_id: str, db: Session = Depends(get_db)):
-    """Get agent by ID"""
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
-    
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
+    await db.commit()
     
     return AgentResponse(
         id=str(agent.id),
@@ -106,43 +74,152 @@ async def get_agent(agent_id: str, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/agents/{agent_id}/transactions")
-async def get_agent_transactions(agent_id: str, db: Session = Depends(get_db)):
-    """Get agent transactions"""
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+@router.get("/agents/{agent_id}", response_model=AgentResponse)
+async def get_agent(agent_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get agent by ID
+    
+    Conditional: send the ETag back in If-None-Match to get a 304 while
+    the agent is unchanged.
+    """
+    result = await db.execute(select(Agent).where(Agent.id == agent_id))
+    agent = result.scalars().first()
     
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    return [
-        {
-            "id": str(tx.id),
-            "tx_hash": tx.tx_hash,
-            "transaction_type": tx.transaction_type,
-            "amount": str(tx.amount),
-            "status": tx.status,
-            "created_at": tx.created_at.isoformat()
-        }
-        for tx in agent.transactions
-    ]
+    version = agent.updated_at or agent.created_at
+    headers = cache_headers(make_etag(agent.id, version), version)
+    response = not_modified(request, headers)
+    if response:
+        return response
+    
+    return ORJSONResponse({
+        "id": str(agent.id),
+        "user_id": str(agent.user_id),
+        "contract_address": agent.contract_address,
+        "name": agent.name,
+        "description": agent.description,
+        "balance": str(agent.balance),
+        "status": agent.status,
+        "created_at": agent.created_at.isoformat()
+    }, headers=headers)
 
 
-@router.get("/agents/{agent_id}/stats")
-async def get_agent_stats(agent_id: str, db: Session = Depends(get_db)):
-    """Get agent statistics"""
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+TRANSACTION_COLUMNS = (
+    Transaction.id,
+    Transaction.tx_hash,
+    Transaction.transaction_type,
+    Transaction.amount,
+    Transaction.status,
+    Transaction.created_at,
+)
+TRANSACTION_KEYS = [column.key for column in TRANSACTION_COLUMNS]
+
+
+@router.get("/agents/{agent_id}/transactions")
+async def get_agent_transactions(
+    agent_id: UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    format: str = "json",
+    db: AsyncSession = Depends(get_db)
+):
+    """Get agent transactions, newest first
     
-    if not agent:
+    `format=json` returns one page of `limit` rows; pass the X-Next-Cursor
+    response header back as `cursor` for the next page. `format=ndjson`
+    streams every matching row (from `cursor` if given) for exports.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    
+    result = await db.execute(select(Agent.id).where(Agent.id == agent_id))
+    found_agent_id = result.scalar()
+    
+    if not found_agent_id:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    transactions = agent.transactions
-    total_trades = len(transactions)
-    successful_trades = len([t for t in transactions if t.status == "success"])
+    query = select(*TRANSACTION_COLUMNS).where(Transaction.agent_id == found_agent_id)
+    if status:
+        query = query.where(Transaction.status == status)
+    if transaction_type:
+        query = query.where(Transaction.transaction_type == transaction_type)
+    if since:
+        query = query.where(sort_key(Transaction.created_at) >= sort_value(Transaction.created_at, since))
+    if until:
+        query = query.where(sort_key(Transaction.created_at) < sort_value(Transaction.created_at, until))
+    keyset = (Transaction.created_at, Transaction.id)
+    if cursor:
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        query = query.where(keyset_before(keyset, after))
+    query = query.order_by(*keyset_order(*keyset))
+    
+    if format == "ndjson":
+        async def export():
+            # The request session closes with the request, so the stream owns its own
+            async with AsyncSessionLocal() as stream_db:
+                rows = await stream_db.stream(
+                    query.execution_options(yield_per=EXPORT_YIELD_PER)
+                )
+                async for partition in rows.partitions():
+                    yield b"".join(dumps(item) + b"\n" for item in row_dicts(partition, TRANSACTION_KEYS))
+        
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+    
+    result = await db.execute(query.limit(limit))
+    items = row_dicts(result, TRANSACTION_KEYS)
+    response = ORJSONResponse(items)
+    set_next_cursor(response, items, limit, "created_at", "id")
+    return response
+
+
+def _volume(amount) -> str:
+    """Summed amount as a string; "0" without trades on every dialect (SQLite returns 0E-18)"""
+    return str(amount) if amount else "0"
+
+
+@router.get("/agents/{agent_id}/stats")
+async def get_agent_stats(agent_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Get agent statistics
+    
+    Counts and volumes are aggregated in a single grouped query rather than
+    loading the agent's transactions.
+    """
+    result = await db.execute(
+        select(
+            Agent.balance,
+            Agent.status,
+            func.count(Transaction.id).label("total_trades"),
+            func.count(Transaction.id).filter(Transaction.status == "success").label("successful_trades"),
+            func.count(Transaction.id).filter(Transaction.status == "failed").label("failed_trades"),
+            func.count(Transaction.id).filter(Transaction.status == "pending").label("pending_trades"),
+            func.coalesce(
+                func.sum(Transaction.amount).filter(Transaction.transaction_type == "buy"), 0
+            ).label("buy_volume"),
+            func.coalesce(
+                func.sum(Transaction.amount).filter(Transaction.transaction_type == "sell"), 0
+            ).label("sell_volume"),
+        )
+        .outerjoin(Transaction, Transaction.agent_id == Agent.id)
+        .where(Agent.id == agent_id)
+        .group_by(Agent.id, Agent.balance, Agent.status)
+    )
+    stats = result.first()
+    
+    if not stats:
+        raise HTTPException(status_code=404, detail="Agent not found")
     
     return {
-        "total_trades": total_trades,
-        "successful_trades": successful_trades,
-        "balance": str(agent.balance),
-        "status": agent.status
+        "total_trades": stats.total_trades,
+        "successful_trades": stats.successful_trades,
+        "failed_trades": stats.failed_trades,
+        "pending_trades": stats.pending_trades,
+        "buy_volume": _volume(stats.buy_volume),
+        "sell_volume": _volume(stats.sell_volume),
+        "balance": str(stats.balance),
+        "status": stats.status
     }
-
@@ -1,55 +1,254 @@
 """Market routes"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+import re
+from decimal import Decimal
+from uuid import UUID
 
-from src.database import get_db
-from src.models.service import Service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import Float, cast, func, literal, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from src.database import engine, get_db
+from src.http_cache import cache_headers, make_etag, not_modified
+from src.models.agent import Agent
+from src.models.payment import Payment
+from src.models.service import SEARCH_VECTOR_COLUMN, Service
+from src.pagination import decode_cursor, keyset_before, set_next_cursor
+from src.serialization import ORJSONResponse, row_dicts
+from src.services.cache import listing_cache
+from src.services.counters import record_rating
 
 router = APIRouter()
 
 
+class RatingCreate(BaseModel):
+    rater_address: str  # Agent contract address
+    rating: int = Field(ge=1, le=5)
+    comment: Optional[str] = None
+
+MARKET_SERVICE_COLUMNS = (
+    Service.id,
+    Service.contract_address,
+    Service.name,
+    Service.description,
+    Service.service_type,
+    Service.price,
+    Service.rating,
+    Service.call_count,
+    Service.provider_address,
+)
+MARKET_SERVICE_KEYS = [column.key for column in MARKET_SERVICE_COLUMNS]
+
+SEARCH_MAX_TERMS = 8
+# Full-text matches ranked per result up to the page's end, taken in (rating, id) order
+SEARCH_RANK_CANDIDATES_PER_RESULT = 2
+# Stored generated column, indexed by ix_services_search (PostgreSQL only)
+SEARCH_VECTOR = literal_column(SEARCH_VECTOR_COLUMN)
+
+
+def search_terms(q: str) -> List[str]:
+    """Lowercased words of a search string (letters and digits only)"""
+    return re.findall(r"[^\W_]+", q.lower())[:SEARCH_MAX_TERMS]
+
+
+def search_filters(service_type: Optional[str]) -> list:
+    """Conditions every search result meets: active, and of `service_type` if given"""
+    filters = [Service.status == "active"]
+    if service_type:
+        filters.append(Service.service_type == service_type)
+    return filters
+
+
+def _search_text(value: str):
+    """Search input rendered into the SQL (terms are letters and digits only)
+
+    psycopg prepares a statement after a few executions and PostgreSQL may
+    then switch to a generic plan that can't see the tsquery, which walks
+    the whole GIN match for common terms. Inline, every query is planned
+    for its own terms.
+    """
+    return literal(value, literal_execute=True)
+
+
+def fulltext_match(terms: List[str]):
+    """search_vector @@ every term as a prefix (uses ix_services_search)
+
+    Each term is written `(term | term:*)`, which matches the same rows as
+    `term:*`: PostgreSQL underestimates prefix matches by orders of
+    magnitude but estimates whole words well, and with a low estimate it
+    ranks every match instead of stopping at the first candidates.
+    """
+    tsquery = func.to_tsquery(
+        literal_column("'english'::regconfig"),
+        _search_text(" & ".join(f"({term} | {term}:*)" for term in terms)),
+    )
+    return SEARCH_VECTOR.op("@@")(tsquery), tsquery
+
+
+def fulltext_search_query(terms: List[str], filters: list, depth: int):
+    """PostgreSQL search: every term as a prefix over name/description
+
+    Matches are taken in (rating, id) order, like the market listing, and
+    only the first SEARCH_RANK_CANDIDATES_PER_RESULT * depth are ranked:
+    a common term stops reading matches once it has enough candidates
+    instead of ranking every one. Candidates are ranked by text relevance
+    boosted up to 2x by rating and logarithmically by call count, so a
+    popular service outranks an unused one with a similar match.
+    """
+    match, tsquery = fulltext_match(terms)
+    candidates = (
+        select(Service.id)
+        .where(match, *filters)
+        .order_by(Service.rating.desc(), Service.id.desc())
+        .limit(SEARCH_RANK_CANDIDATES_PER_RESULT * depth)
+        .subquery()
+    )
+    rating_boost = 1 + cast(func.coalesce(Service.rating, 0), Float) / 5
+    usage_boost = 1 + func.ln(1 + cast(func.coalesce(Service.call_count, 0), Float)) / 10
+    return (
+        select(*MARKET_SERVICE_COLUMNS)
+        .join(candidates, candidates.c.id == Service.id)
+        .order_by((func.ts_rank(SEARCH_VECTOR, tsquery) * rating_boost * usage_boost).desc(), Service.id.desc())
+    )
+
+
+def fuzzy_search_query(terms: List[str], filters: list):
+    """PostgreSQL fallback when nothing matches as a word: names similar to the terms
+
+    The trigram `%` match uses ix_services_name_trgm; results are ordered
+    by similarity.
+    """
+    text = _search_text(" ".join(terms))
+    return (
+        select(*MARKET_SERVICE_COLUMNS)
+        .where(Service.name.op("%")(text), *filters)
+        .order_by(func.similarity(Service.name, text).desc(), Service.id.desc())
+    )
+
+
+def like_search_query(terms: List[str], filters: list):
+    """Fallback for databases without full-text search (SQLite)
+
+    Every term must appear in the name or description. Ordered like the
+    market listing (rating, id) so a page stops scanning once it is full
+    instead of ranking every match.
+    """
+    matches = [
+        or_(Service.name.icontains(term, autoescape=True), Service.description.icontains(term, autoescape=True))
+        for term in terms
+    ]
+    return (
+        select(*MARKET_SERVICE_COLUMNS)
+        .where(*matches, *filters)
+        .order_by(Service.rating.desc(), Service.id.desc())
+    )
+
+
+def search_query(terms: List[str], filters: list, depth: int):
+    """The search's primary query; `depth` is offset + limit of the page"""
+    if engine.dialect.name == "postgresql":
+        return fulltext_search_query(terms, filters, depth)
+    return like_search_query(terms, filters)
+
+
+def _market_items(result) -> List[dict]:
+    items = row_dicts(result, MARKET_SERVICE_KEYS)
+    for item in items:
+        item["rating"] = float(item["rating"])
+    return items
+
+
 @router.get("/market/services")
 async def get_market_services(
     service_type: Optional[str] = None,
-    limit: int = 20,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get services from market"""
-    query = db.query(Service).filter(Service.status == "active")
+    """Get services from market
     
-    if service_type:
-        query = query.filter(Service.service_type == service_type)
+    Pass the X-Next-Cursor response header back as `cursor` to page by
+    (rating, id) instead of offset.
+    """
+    after = decode_cursor(cursor, Decimal, UUID) if cursor else None
     
-    services = query.order_by(Service.rating.desc()).offset(offset).limit(limit).all()
+    async def load():
+        query = select(*MARKET_SERVICE_COLUMNS).where(Service.status == "active")
+        
+        if service_type:
+            query = query.where(Service.service_type == service_type)
+        
+        query = query.order_by(Service.rating.desc(), Service.id.desc())
+        if after:
+            query = query.where(keyset_before((Service.rating, Service.id), after))
+        else:
+            query = query.offset(offset)
+        
+        result = await db.execute(query.limit(limit))
+        return _market_items(result)
     
-    return [
-        {
-            "id": str(s.id),
-            "contract_address": s.contract_address,
-            "name": s.name,
-            "description": s.description,
-            "service_type": s.service_type,
-            "price": str(s.price),
-            "rating": float(s.rating),
-            "call_count": s.call_count,
-            "provider_address": s.provider_address
-        }
-        for s in services
-    ]
+    items = await listing_cache.get_or_load("market", (service_type, limit, offset, cursor), load)
+    response = ORJSONResponse(items)
+    set_next_cursor(response, items, limit, "rating", "id")
+    return response
+
+
+@router.get("/market/services/search")
+async def search_market_services(
+    q: str = Query(min_length=1, max_length=200),
+    service_type: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search active services by name and description
+    
+    Terms match as prefixes ("trad" finds "trading"); on PostgreSQL a
+    misspelled name still matches by trigram similarity when no service
+    matches the terms as words. Results are ranked by relevance, rating and
+    call count. Pages are cached by the normalized terms, in a bounded
+    per-worker cache.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return ORJSONResponse([])
+    
+    async def load():
+        filters = search_filters(service_type)
+        result = await db.execute(search_query(terms, filters, offset + limit).limit(limit).offset(offset))
+        items = _market_items(result)
+        if items or engine.dialect.name != "postgresql":
+            return items
+        if offset:
+            # An empty later page of word matches is the end of them, not a reason to go fuzzy
+            match, _ = fulltext_match(terms)
+            if await db.scalar(select(select(Service.id).where(match, *filters).exists())):
+                return items
+        result = await db.execute(fuzzy_search_query(terms, filters).limit(limit).offset(offset))
+        return _market_items(result)
+    
+    items = await listing_cache.get_or_load("search", (" ".join(terms), service_type, limit, offset), load)
+    return ORJSONResponse(items)
 
 
 @router.get("/market/services/{service_id}")
-async def get_market_service(service_id: str, db: Session = Depends(get_db)):
-    """Get service details from market"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+async def get_market_service(service_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get service details from market (conditional on the ETag, like GET /services/{service_id})"""
+    result = await db.execute(select(Service).where(Service.id == service_id))
+    service = result.scalars().first()
     
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    return {
+    version = service.updated_at or service.created_at
+    headers = cache_headers(make_etag(service.id, version), version)
+    response = not_modified(request, headers)
+    if response:
+        return response
+    
+    return ORJSONResponse({
         "id": str(service.id),
         "contract_address": service.contract_address,
         "name": service.name,
@@ -60,5 +259,37 @@ async def get_market_service(service_id: str, db: Session = Depends(get_db)):
         "call_count": service.call_count,
         "provider_address": service.provider_address,
         "pricing_model": service.pricing_model
-    }
+    }, headers=headers)
 
+
+
+@router.post("/market/services/{service_id}/ratings")
+async def rate_market_service(service_id: UUID, rating: RatingCreate, db: AsyncSession = Depends(get_db)):
+    """Rate a service 1-5, like Market.rateService
+    
+    The rater must be an agent that has paid for the service. Rating again
+    replaces the agent's previous rating. The service's average rating is
+    updated with the next batched counter flush.
+    """
+    result = await db.execute(select(Service.status).where(Service.id == service_id))
+    status = result.scalar_one_or_none()
+    if status is None or status == "delisted":
+        raise HTTPException(status_code=404, detail="Service not found")
+    
+    result = await db.execute(
+        select(Payment.id)
+        .join(Agent, Agent.id == Payment.agent_id)
+        .where(Payment.service_id == service_id, Agent.contract_address == rating.rater_address)
+        .limit(1)
+    )
+    if result.first() is None:
+        raise HTTPException(status_code=403, detail="Must use service before rating")
+    
+    await record_rating(db, service_id, rating.rater_address, rating.rating, rating.comment)
+    
+    return {
+        "service_id": str(service_id),
+        "rater_address": rating.rater_address,
+        "rating": rating.rating,
+        "comment": rating.comment
+    }
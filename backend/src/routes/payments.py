@@ -1,15 +1,64 @@
 """Payment routes"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
+from src.config import settings
 from src.database import get_db
+from src.http_cache import cache_headers, make_etag, not_modified
 from src.models.payment import Payment
+from src.pagination import decode_cursor, keyset_before, keyset_order, set_next_cursor
+from src.serialization import ORJSONResponse, row_dicts
+from src.services.x402_payment import X402PaymentService
 
 router = APIRouter()
 
 
+PAYMENT_COLUMNS = (
+    Payment.id,
+    Payment.payment_id,
+    Payment.tx_hash,
+    Payment.amount,
+    Payment.payment_type,
+    Payment.status,
+    Payment.created_at,
+)
+PAYMENT_KEYS = [column.key for column in PAYMENT_COLUMNS]
+
+# Final statuses set by the confirmation worker from the transaction receipt
+SETTLED_PAYMENT_STATUSES = ("confirmed", "failed")
+
+
+class PaymentCreate(BaseModel):
+    payment_id: str
+    tx_hash: str
+    amount: Decimal
+    payment_type: str
+    agent_id: Optional[UUID] = None
+    service_id: Optional[UUID] = None
+
+
+class PaymentBatchCreate(BaseModel):
+    payments: list[PaymentCreate]
+
+
+class PaymentBatchItem(BaseModel):
+    payment_id: str
+    status: str  # created, duplicate, conflict, invalid
+
+
+class PaymentBatchResponse(BaseModel):
+    created: int
+    items: list[PaymentBatchItem]
+
+
 class PaymentResponse(BaseModel):
     id: str
     payment_id: str
@@ -25,52 +74,100 @@ class PaymentResponse(BaseModel):
 
 @router.get("/payments", response_model=list[PaymentResponse])
 async def get_payments(
-    agent_id: Optional[str] = None,
-    service_id: Optional[str] = None,
-    limit: int = 20,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    agent_id: Optional[UUID] = None,
+    service_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get payments list"""
-    query = db.query(Payment)
+    """Get payments list
+    
+    Pass the X-Next-Cursor response header back as `cursor` to page by
+    (created_at, id) instead of offset.
+    """
+    query = select(*PAYMENT_COLUMNS)
     
     if agent_id:
-        query = query.filter(Payment.agent_id == agent_id)
+        query = query.where(Payment.agent_id == agent_id)
     
     if service_id:
-        query = query.filter(Payment.service_id == service_id)
+        query = query.where(Payment.service_id == service_id)
+    
+    keyset = (Payment.created_at, Payment.id)
+    query = query.order_by(*keyset_order(*keyset))
+    if cursor:
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        query = query.where(keyset_before(keyset, after))
+    else:
+        query = query.offset(offset)
     
-    payments = query.order_by(Payment.created_at.desc()).offset(offset).limit(limit).all()
+    result = await db.execute(query.limit(limit))
+    items = row_dicts(result, PAYMENT_KEYS)
+    response = ORJSONResponse(items)
+    set_next_cursor(response, items, limit, "created_at", "id")
+    return response
+
+
+@router.post("/payments/batch", response_model=PaymentBatchResponse)
+async def create_payments_batch(batch: PaymentBatchCreate, db: AsyncSession = Depends(get_db)):
+    """Record many payments in one statement
+
+    Already recorded payment IDs are reported as `duplicate`, payments whose
+    tx_hash belongs to another payment as `conflict` and payments referencing
+    an unknown agent or service as `invalid`; none of them fails the batch.
+    """
+    if len(batch.payments) > settings.PAYMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.PAYMENT_BATCH_MAX_ITEMS} payments per batch"
+        )
     
-    return [
-        PaymentResponse(
-            id=str(p.id),
-            payment_id=p.payment_id,
-            tx_hash=p.tx_hash,
-            amount=str(p.amount),
-            payment_type=p.payment_type,
-            status=p.status,
-            created_at=p.created_at.isoformat()
+    try:
+        statuses = await X402PaymentService().record_payments(
+            [payment.model_dump() for payment in batch.payments], db
         )
-        for p in payments
-    ]
+    except IntegrityError:
+        # A concurrent request claimed one of the tx hashes after the lookup
+        raise HTTPException(status_code=409, detail="Batch conflicts with a concurrent write, retry it")
+    
+    return PaymentBatchResponse(
+        created=statuses.count("created"),
+        items=[
+            PaymentBatchItem(payment_id=payment.payment_id, status=status)
+            for payment, status in zip(batch.payments, statuses)
+        ]
+    )
 
 
 @router.get("/payments/{payment_id}", response_model=PaymentResponse)
-async def get_payment(payment_id: str, db: Session = Depends(get_db)):
-    """Get payment by payment ID"""
-    payment = db.query(Payment).filter(Payment.payment_id == payment_id).first()
+async def get_payment(payment_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get payment by payment ID
+    
+    Only the status of a payment changes: pending payments are revalidated
+    by ETag on every request, confirmed and failed ones after
+    HTTP_CACHE_MAX_AGE like the other detail endpoints (a reorg can still
+    send them back to pending).
+    """
+    result = await db.execute(select(Payment).where(Payment.payment_id == payment_id))
+    payment = result.scalars().first()
     
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
-    return PaymentResponse(
-        id=str(payment.id),
-        payment_id=payment.payment_id,
-        tx_hash=payment.tx_hash,
-        amount=str(payment.amount),
-        payment_type=payment.payment_type,
-        status=payment.status,
-        created_at=payment.created_at.isoformat()
-    )
-
+    # A pending payment may be settled by the confirmation worker at any moment
+    settled = payment.status in SETTLED_PAYMENT_STATUSES
+    headers = cache_headers(make_etag(payment.id, payment.status), max_age=None if settled else 0)
+    response = not_modified(request, headers)
+    if response:
+        return response
+    
+    return ORJSONResponse({
+        "id": str(payment.id),
+        "payment_id": payment.payment_id,
+        "tx_hash": payment.tx_hash,
+        "amount": str(payment.amount),
+        "payment_type": payment.payment_type,
+        "status": payment.status,
+        "created_at": payment.created_at.isoformat()
+    }, headers=headers)
@@ -1,11 +1,19 @@
 """Service routes"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
-from src.database import get_db
+from src.database import get_db, insert_or_get
+from src.http_cache import cache_headers, make_etag, not_modified
 from src.models.service import Service
+from src.pagination import decode_cursor, keyset_before, set_next_cursor
+from src.serialization import ORJSONResponse, row_dicts
+from src.services.cache import listing_cache
 
 router = APIRouter()
 
@@ -20,6 +28,22 @@ class ServiceCreate(BaseModel):
     pricing_model: str = "pay_per_use"
 
 
+SERVICE_COLUMNS = (
+    Service.id,
+    Service.provider_address,
+    Service.contract_address,
+    Service.name,
+    Service.description,
+    Service.service_type,
+    Service.price,
+    Service.rating,
+    Service.call_count,
+    Service.status,
+    Service.created_at,
+)
+SERVICE_KEYS = [column.key for column in SERVICE_COLUMNS]
+
+
 class ServiceResponse(BaseModel):
     id: str
     provider_address: str
@@ -38,30 +62,14 @@ class ServiceResponse(BaseModel):
 
 
 @router.post("/services", response_model=ServiceResponse)
-async def create_service(service_data: ServiceCreate, db: Session = Depends(get_db)):
-    """Create a new service"""
-    # Check if service already exists
-    existing_service = db.query(Service).filter(
-        Service.contract_address == service_data.contract_address
-    ).first()
-    
-    if existing_service:
-        return ServiceResponse(
-            id=str(existing_service.id),
-            provider_address=existing_service.provider_address,
-            contract_address=existing_service.contract_address,
-            name=existing_service.name,
-            description=existing_service.description,
-            service_type=existing_service.service_type,
-            price=str(existing_service.price),
-            rating=str(existing_service.rating),
-            call_count=existing_service.call_count,
-            status=existing_service.status,
-            created_at=existing_service.created_at.isoformat()
-        )
-    
-    # Create new service
-    new_service = Service(
+async def create_service(service_data: ServiceCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new service (returns the existing one for a known contract address)"""
+    new_id = uuid4()
+    service = await insert_or_get(
+        db,
+        Service,
+        "contract_address",
+        id=new_id,
         provider_address=service_data.provider_address,
         contract_address=service_data.contract_address,
         name=service_data.name,
@@ -70,77 +78,92 @@ async def create_service(service_data: ServiceCreate, db: Session = Depends(get_
         price=service_data.price,
         pricing_model=service_data.pricing_model
     )
-    db.add(new_service)
-    db.commit()
-    db.refresh(new_service)
+    await db.commit()
+    
+    if service.id == new_id:
+        # New listings must show up on the next page view
+        await listing_cache.invalidate()
     
     return ServiceResponse(
-        id=str(new_service.id),
-        provider_address=new_service.provider_address,
-        contract_address=new_service.contract_address,
-        name=new_service.name,
-        description=new_service.description,
-        service_type=new_service.service_type,
-        price=str(new_service.price),
-        rating=str(new_service.rating),
-        call_count=new_service.call_count,
-        status=new_service.status,
-        created_at=new_service.created_at.isoformat()
+        id=str(service.id),
+        provider_address=service.provider_address,
+        contract_address=service.contract_address,
+        name=service.name,
+        description=service.description,
+        service_type=service.service_type,
+        price=str(service.price),
+        rating=str(service.rating),
+        call_count=service.call_count,
+        status=service.status,
+        created_at=service.created_at.isoformat()
     )
 
 
 @router.get("/services", response_model=list[ServiceResponse])
 async def get_services(
     service_type: Optional[str] = None,
-    limit: int = 20,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get services list"""
-    query = db.query(Service).filter(Service.status == "active")
+    """Get services list
     
-    if service_type:
-        query = query.filter(Service.service_type == service_type)
+    Ordered by (rating, id); pass the X-Next-Cursor response header back as
+    `cursor` to page by key instead of offset.
+    """
+    after = decode_cursor(cursor, Decimal, UUID) if cursor else None
     
-    services = query.offset(offset).limit(limit).all()
+    async def load():
+        query = select(*SERVICE_COLUMNS).where(Service.status == "active")
+        
+        if service_type:
+            query = query.where(Service.service_type == service_type)
+        
+        query = query.order_by(Service.rating.desc(), Service.id.desc())
+        if after:
+            query = query.where(keyset_before((Service.rating, Service.id), after))
+        else:
+            query = query.offset(offset)
+        
+        result = await db.execute(query.limit(limit))
+        return row_dicts(result, SERVICE_KEYS)
     
-    return [
-        ServiceResponse(
-            id=str(s.id),
-            provider_address=s.provider_address,
-            contract_address=s.contract_address,
-            name=s.name,
-            description=s.description,
-            service_type=s.service_type,
-            price=str(s.price),
-            rating=str(s.rating),
-            call_count=s.call_count,
-            status=s.status,
-            created_at=s.created_at.isoformat()
-        )
-        for s in services
-    ]
+    items = await listing_cache.get_or_load("services", (service_type, limit, offset, cursor), load)
+    response = ORJSONResponse(items)
+    set_next_cursor(response, items, limit, "rating", "id")
+    return response
 
 
 @router.get("/services/{service_id}", response_model=ServiceResponse)
-async def get_service(service_id: str, db: Session = Depends(get_db)):
-    """Get service by ID"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+async def get_service(service_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get service by ID
+    
+    Conditional: send the ETag back in If-None-Match to get a 304 while
+    the service is unchanged.
+    """
+    result = await db.execute(select(Service).where(Service.id == service_id))
+    service = result.scalars().first()
     
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    return ServiceResponse(
-        id=str(service.id),
-        provider_address=service.provider_address,
-        contract_address=service.contract_address,
-        name=service.name,
-        description=service.description,
-        service_type=service.service_type,
-        price=str(service.price),
-        rating=str(service.rating),
-        call_count=service.call_count,
-        status=service.status,
-        created_at=service.created_at.isoformat()
-    )
-
+    version = service.updated_at or service.created_at
+    headers = cache_headers(make_etag(service.id, version), version)
+    response = not_modified(request, headers)
+    if response:
+        return response
+    
+    return ORJSONResponse({
+        "id": str(service.id),
+        "provider_address": service.provider_address,
+        "contract_address": service.contract_address,
+        "name": service.name,
+        "description": service.description,
+        "service_type": service.service_type,
+        "price": str(service.price),
+        "rating": str(service.rating),
+        "call_count": service.call_count,
+        "status": service.status,
+        "created_at": service.created_at.isoformat()
+    }, headers=headers)
@@ -1,9 +1,12 @@
 """User routes"""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
 from pydantic import BaseModel
 
-from src.database import get_db
+from src.database import get_db, insert_or_get
+from src.models.agent import Agent
 from src.models.user import User
 
 router = APIRouter()
@@ -23,37 +26,23 @@ class UserResponse(BaseModel):
 
 
 @router.post("/users", response_model=UserResponse)
-async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Create a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(
-        User.wallet_address == user_data.wallet_address
-    ).first()
-    
-    if existing_user:
-        return UserResponse(
-            id=str(existing_user.id),
-            wallet_address=existing_user.wallet_address,
-            created_at=existing_user.created_at.isoformat()
-        )
-    
-    # Create new user
-    new_user = User(wallet_address=user_data.wallet_address)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new user (returns the existing one for a known wallet)"""
+    user = await insert_or_get(db, User, "wallet_address", wallet_address=user_data.wallet_address)
+    await db.commit()
     
     return UserResponse(
-        id=str(new_user.id),
-        wallet_address=new_user.wallet_address,
-        created_at=new_user.created_at.isoformat()
+        id=str(user.id),
+        wallet_address=user.wallet_address,
+        created_at=user.created_at.isoformat()
     )
 
 
 @router.get("/users/{wallet_address}", response_model=UserResponse)
-async def get_user(wallet_address: str, db: Session = Depends(get_db)):
+async def get_user(wallet_address: str, db: AsyncSession = Depends(get_db)):
     """Get user by wallet address"""
-    user = db.query(User).filter(User.wallet_address == wallet_address).first()
+    result = await db.execute(select(User).where(User.wallet_address == wallet_address))
+    user = result.scalars().first()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -66,9 +55,21 @@ async def get_user(wallet_address: str, db: Session = Depends(get_db)):
 
 
 @router.get("/users/{wallet_address}/agents")
-async def get_user_agents(wallet_address: str, db: Session = Depends(get_db)):
-    """Get all agents for a user"""
-    user = db.query(User).filter(User.wallet_address == wallet_address).first()
+async def get_user_agents(wallet_address: str, db: AsyncSession = Depends(get_db)):
+    """Get all agents for a user
+    
+    The user and their agents come back from one LEFT OUTER JOIN, loading
+    only the agent columns the response needs.
+    """
+    result = await db.execute(
+        select(User)
+        .options(
+            load_only(User.id),
+            joinedload(User.agents).load_only(Agent.id, Agent.name, Agent.contract_address)
+        )
+        .where(User.wallet_address == wallet_address)
+    )
+    user = result.unique().scalars().first()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
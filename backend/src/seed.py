@@ -0,0 +1,351 @@
+"""
+Mock and synthetic seed data.
+
+All inserts are bulk `INSERT ... ON CONFLICT DO NOTHING` keyed on the
+tables' unique columns, so seeding is idempotent and cheap to re-run.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from src.database import dialect_insert
+from src.models import User, Agent, Service, Transaction, Payment
+
+TARGET_WALLET = "0x60a969a669db4837ffc9d96bb81668c87041f4a4"
+
+# Synthetic rows get stable ids so re-runs conflict instead of duplicating
+SYNTHETIC_NAMESPACE = uuid.UUID("6f1c9a52-3b0e-4d8e-9a61-5c2f0e4b7d13")
+SERVICE_TYPES = ["strategy", "risk_control", "data_source", "other"]
+
+
+def generate_mock_address(index: int) -> str:
+    """Generate a mock Ethereum address"""
+    hex_part = hex(index)[2:].zfill(40)
+    return f"0x{hex_part}"
+
+
+AGENTS_DATA = [
+    {"name": "Alpha Trader", "description": "High-frequency trading agent specializing in momentum strategies",
+     "contract_address": generate_mock_address(1), "balance": Decimal("1000.0"), "status": "active"},
+    {"name": "Beta Strategy", "description": "Multi-strategy agent with risk-adjusted portfolio management",
+     "contract_address": generate_mock_address(2), "balance": Decimal("500.0"), "status": "active"},
+    {"name": "Gamma Risk Manager", "description": "Advanced risk control agent with dynamic position sizing",
+     "contract_address": generate_mock_address(3), "balance": Decimal("200.0"), "status": "paused"},
+    {"name": "Delta Analyzer", "description": "AI-powered market analysis agent with sentiment detection",
+     "contract_address": generate_mock_address(4), "balance": Decimal("1500.0"), "status": "active"},
+    {"name": "Epsilon Bot", "description": "Automated trading bot with low capital requirements",
+     "contract_address": generate_mock_address(5), "balance": Decimal("10.0"), "status": "insufficient_balance"}
+]
+
+SERVICES_DATA = [
+    # Strategy services
+    {"name": "Momentum Strategy", "description": "Advanced momentum-based trading strategy with ML optimization",
+     "service_type": "strategy", "contract_address": generate_mock_address(10),
+     "provider_address": generate_mock_address(100), "price": Decimal("50.0"), "pricing_model": "pay_per_use",
+     "rating": Decimal("4.5"), "call_count": 120},
+    {"name": "Mean Reversion Bot", "description": "Statistical arbitrage bot using mean reversion principles",
+     "service_type": "strategy", "contract_address": generate_mock_address(11),
+     "provider_address": generate_mock_address(101), "price": Decimal("75.0"), "pricing_model": "pay_per_use",
+     "rating": Decimal("4.2"), "call_count": 89},
+    {"name": "Trend Following AI", "description": "AI-powered trend following system with adaptive parameters",
+     "service_type": "strategy", "contract_address": generate_mock_address(12),
+     "provider_address": generate_mock_address(102), "price": Decimal("100.0"), "pricing_model": "subscription",
+     "rating": Decimal("4.8"), "call_count": 200},
+    # Risk Control services
+    {"name": "Portfolio Risk Analyzer", "description": "Real-time portfolio risk assessment and VaR calculation",
+     "service_type": "risk_control", "contract_address": generate_mock_address(20),
+     "provider_address": generate_mock_address(110), "price": Decimal("30.0"), "pricing_model": "pay_per_use",
+     "rating": Decimal("4.0"), "call_count": 150},
+    {"name": "Stop Loss Manager", "description": "Dynamic stop-loss management with trailing stop functionality",
+     "service_type": "risk_control", "contract_address": generate_mock_address(21),
+     "provider_address": generate_mock_address(111), "price": Decimal("25.0"), "pricing_model": "pay_per_use",
+     "rating": Decimal("4.3"), "call_count": 95},
+    {"name": "Position Sizer", "description": "Optimal position sizing based on Kelly Criterion and risk tolerance",
+     "service_type": "risk_control", "contract_address": generate_mock_address(22),
+     "provider_address": generate_mock_address(112), "price": Decimal("40.0"), "pricing_model": "subscription",
+     "rating": Decimal("4.6"), "call_count": 180},
+    # Data Source services
+    {"name": "Real-time Price Feed", "description": "High-frequency price data feed with sub-second latency",
+     "service_type": "data_source", "contract_address": generate_mock_address(30),
+     "provider_address": generate_mock_address(120), "price": Decimal("20.0"), "pricing_model": "subscription",
+     "rating": Decimal("4.7"), "call_count": 300},
+    {"name": "Market Sentiment API", "description": "Social media and news sentiment analysis for crypto markets",
+     "service_type": "data_source", "contract_address": generate_mock_address(31),
+     "provider_address": generate_mock_address(121), "price": Decimal("35.0"), "pricing_model": "pay_per_use",
+     "rating": Decimal("4.1"), "call_count": 145},
+    {"name": "On-chain Analytics", "description": "On-chain metrics including whale movements and exchange flows",
+     "service_type": "data_source", "contract_address": generate_mock_address(32),
+     "provider_address": generate_mock_address(122), "price": Decimal("45.0"), "pricing_model": "subscription",
+     "rating": Decimal("4.4"), "call_count": 220},
+    # Other services
+    {"name": "Backtesting Engine", "description": "Historical backtesting engine with walk-forward optimization",
+     "service_type": "other", "contract_address": generate_mock_address(40),
+     "provider_address": generate_mock_address(130), "price": Decimal("60.0"), "pricing_model": "pay_per_use",
+     "rating": Decimal("4.5"), "call_count": 75},
+    {"name": "Performance Reporter", "description": "Automated performance reporting with PnL analysis and metrics",
+     "service_type": "other", "contract_address": generate_mock_address(41),
+     "provider_address": generate_mock_address(131), "price": Decimal("15.0"), "pricing_model": "subscription",
+     "rating": Decimal("4.2"), "call_count": 110},
+    {"name": "Alert System", "description": "Multi-channel alert system for trading signals and risk events",
+     "service_type": "other", "contract_address": generate_mock_address(42),
+     "provider_address": generate_mock_address(132), "price": Decimal("10.0"), "pricing_model": "subscription",
+     "rating": Decimal("4.0"), "call_count": 250}
+]
+
+
+def _insert_ignore(db: Session, model, rows: List[dict]) -> int:
+    """Bulk insert rows, skipping any that hit a unique constraint; returns rows inserted"""
+    if not rows:
+        return 0
+    result = db.execute(dialect_insert(model).values(rows).on_conflict_do_nothing())
+    return max(result.rowcount, 0)
+
+
+def seed_mock_data(db: Session, with_activity: bool = True) -> Dict[str, int]:
+    """Seed the demo user, agents and services (plus transactions and payments
+    when `with_activity`). Returns the number of new rows per table."""
+    created = {}
+
+    # 1. User
+    created["users"] = _insert_ignore(db, User, [{"id": uuid.uuid4(), "wallet_address": TARGET_WALLET}])
+    user_id = db.execute(select(User.id).where(User.wallet_address == TARGET_WALLET)).scalar_one()
+
+    # 2. Agents
+    created["agents"] = _insert_ignore(
+        db, Agent, [{"id": uuid.uuid4(), "user_id": user_id, **data} for data in AGENTS_DATA]
+    )
+    # 3. Services
+    created["services"] = _insert_ignore(
+        db, Service, [{"id": uuid.uuid4(), "status": "active", **data} for data in SERVICES_DATA]
+    )
+    db.commit()
+
+    if not with_activity:
+        return created
+
+    # Resolve ids in seed order with one query per table
+    agent_rows = {
+        row.contract_address: row
+        for row in db.execute(
+            select(Agent.id, Agent.contract_address, Agent.status)
+            .where(Agent.contract_address.in_([a["contract_address"] for a in AGENTS_DATA]))
+        )
+    }
+    agents = [agent_rows[a["contract_address"]] for a in AGENTS_DATA]
+    service_rows = {
+        row.contract_address: row
+        for row in db.execute(
+            select(Service.id, Service.contract_address, Service.price)
+            .where(Service.contract_address.in_([s["contract_address"] for s in SERVICES_DATA]))
+        )
+    }
+    services = [service_rows[s["contract_address"]] for s in SERVICES_DATA]
+
+    # 4. Transactions
+    token_addresses = [
+        generate_mock_address(200),  # Token A
+        generate_mock_address(201),  # Token B
+        generate_mock_address(202),  # Token C
+    ]
+    transactions = []
+    transaction_index = 0
+    for agent in agents:
+        # Create 2-3 transactions per agent
+        num_transactions = 2 if agent.status == "paused" else 3
+        for i in range(num_transactions):
+            transaction_index += 1
+            is_buy = i % 2 == 0
+            transactions.append({
+                "id": uuid.uuid4(),
+                "agent_id": agent.id,
+                "tx_hash": f"0x{hex(transaction_index * 1000 + i)[2:].zfill(64)}",
+                "transaction_type": "buy" if is_buy else "sell",
+                "token_address": token_addresses[i % len(token_addresses)],
+                "amount": Decimal(f"{100 + i * 50}.0"),
+                "price": Decimal(f"{1.5 + i * 0.1}"),
+                "status": "success" if transaction_index % 3 != 0 else ("pending" if transaction_index % 3 == 1 else "failed"),
+                "block_number": Decimal(f"{1000000 + transaction_index}"),
+            })
+    created["transactions"] = _insert_ignore(db, Transaction, transactions)
+
+    # 5. Payments (only for the first 3 agents)
+    payments = []
+    payment_index = 0
+    for agent in agents[:3]:
+        # Create 1-2 payments per agent
+        num_payments = 1 if agent.status == "paused" else 2
+        for i in range(num_payments):
+            payment_index += 1
+            service = services[payment_index % len(services)]
+            payments.append({
+                "id": uuid.uuid4(),
+                "agent_id": agent.id,
+                "service_id": service.id,
+                "tx_hash": f"0x{hex(payment_index * 2000 + i)[2:].zfill(64)}",
+                "payment_id": f"pay_{payment_index:06d}",
+                "amount": service.price,
+                "payment_type": "service_call" if i % 2 == 0 else "subscription",
+                "status": "confirmed" if payment_index % 2 == 0 else "pending",
+                "block_number": Decimal(f"{2000000 + payment_index}"),
+            })
+    created["payments"] = _insert_ignore(db, Payment, payments)
+    db.commit()
+
+    return created
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data for load testing
+# ---------------------------------------------------------------------------
+
+def _synthetic_id(kind: str, index: int) -> uuid.UUID:
+    return uuid.uuid5(SYNTHETIC_NAMESPACE, f"{kind}:{index}")
+
+
+def _synthetic_address(kind_offset: int, index: int) -> str:
+    # Offsets keep synthetic addresses clear of the mock ones above
+    return generate_mock_address(kind_offset * 10**12 + index)
+
+
+def _synthetic_users(count: int) -> Iterator[dict]:
+    for i in range(count):
+        yield {"id": _synthetic_id("user", i), "wallet_address": _synthetic_address(1, i)}
+
+
+def _synthetic_agents(count: int, users: int) -> Iterator[dict]:
+    statuses = ["active", "active", "active", "paused", "insufficient_balance"]
+    for i in range(count):
+        yield {
+            "id": _synthetic_id("agent", i),
+            "user_id": _synthetic_id("user", i % users),
+            "contract_address": _synthetic_address(2, i),
+            "name": f"Synthetic Agent {i}",
+            "description": "Synthetic agent for load testing",
+            "balance": Decimal(i % 5000),
+            "status": statuses[i % len(statuses)],
+        }
+
+
+def _synthetic_services(count: int) -> Iterator[dict]:
+    for i in range(count):
+        rating = Decimal(i * 37 % 501) / 100
+        yield {
+            "id": _synthetic_id("service", i),
+            "provider_address": _synthetic_address(3, i % max(count // 10, 1)),
+            "contract_address": _synthetic_address(4, i),
+            "name": f"Synthetic {SERVICE_TYPES[i % len(SERVICE_TYPES)].replace('_', ' ')} service {i}",
+            "description": "Synthetic service for load testing",
+            "service_type": SERVICE_TYPES[i % len(SERVICE_TYPES)],
+            "price": Decimal(5 + i % 200),
+            "pricing_model": "pay_per_use" if i % 3 else "subscription",
+            "rating": rating,
+            "call_count": i * 13 % 10000,
+            "status": "active" if i % 20 else "paused",
+        }
+
+
+def _synthetic_transactions(count: int, agents: int, start: datetime) -> Iterator[dict]:
+    statuses = ["success", "success", "success", "pending", "failed"]
+    for i in range(count):
+        yield {
+            "id": _synthetic_id("transaction", i),
+            "agent_id": _synthetic_id("agent", i % agents),
+            "tx_hash": f"0x{(1 << 252) + i:064x}",
+            "transaction_type": "buy" if i % 2 == 0 else "sell",
+            "token_address": _synthetic_address(5, i % 50),
+            "amount": Decimal(10 + i % 1000),
+            "price": Decimal(1 + i % 100) / 10,
+            "status": statuses[i % len(statuses)],
+            "block_number": 1000000 + i,
+            "created_at": start + timedelta(seconds=i),
+        }
+
+
+def _synthetic_payments(count: int, agents: int, services: int, start: datetime) -> Iterator[dict]:
+    for i in range(count):
+        yield {
+            "id": _synthetic_id("payment", i),
+            "agent_id": _synthetic_id("agent", i % agents),
+            "service_id": _synthetic_id("service", i % services),
+            "tx_hash": f"0x{(2 << 252) + i:064x}",
+            "payment_id": f"synthetic_pay_{i:010d}",
+            "amount": Decimal(5 + i % 200),
+            "payment_type": "service_call" if i % 4 else "subscription",
+            "status": "confirmed" if i % 10 else "pending",
+            "block_number": 2000000 + i,
+            "created_at": start + timedelta(seconds=i),
+        }
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy_insert_ignore(conn, table, columns: Sequence[str], rows: List[dict]):
+    """PostgreSQL: COPY into a temp table, then INSERT ... SELECT ... ON CONFLICT DO NOTHING"""
+    staging = f"_seed_{table.name}"
+    column_list = ", ".join(columns)
+    conn.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    ))
+    cursor = conn.connection.driver_connection.cursor()
+    with cursor.copy(f"COPY {staging} ({column_list}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row([row[c] for c in columns])
+    conn.execute(text(
+        f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging} ON CONFLICT DO NOTHING"
+    ))
+
+
+def seed_synthetic_data(
+    engine,
+    agents: int = 0,
+    services: int = 0,
+    transactions: int = 0,
+    payments: int = 0,
+    batch_size: int = 50000,
+    progress=print,
+):
+    """Generate load-test volumes of synthetic rows.
+
+    PostgreSQL (psycopg3) loads each batch with COPY; other databases fall
+    back to batched multi-row inserts. Each batch commits on its own so
+    memory stays flat at millions of rows, and re-runs skip existing rows.
+    """
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg"
+    start = datetime.now(timezone.utc) - timedelta(seconds=max(transactions, payments))
+    users = max(agents // 10, 1)
+    agents = max(agents, 1) if (transactions or payments) else agents
+    services = max(services, 1) if payments else services
+
+    plan = [
+        (User, users if agents else 0, lambda: _synthetic_users(users)),
+        (Agent, agents, lambda: _synthetic_agents(agents, users)),
+        (Service, services, lambda: _synthetic_services(services)),
+        (Transaction, transactions, lambda: _synthetic_transactions(transactions, agents, start)),
+        (Payment, payments, lambda: _synthetic_payments(payments, agents, services, start)),
+    ]
+    for model, count, rows in plan:
+        if not count:
+            continue
+        table = model.__table__
+        loaded = 0
+        for chunk in _chunks(rows(), batch_size):
+            with engine.begin() as conn:
+                if use_copy:
+                    _copy_insert_ignore(conn, table, list(chunk[0].keys()), chunk)
+                else:
+                    conn.execute(dialect_insert(model).on_conflict_do_nothing(), chunk)
+            loaded += len(chunk)
+            progress(f"  {table.name}: {loaded}/{count}")
@@ -0,0 +1,39 @@
+"""Fast JSON encoding for list endpoints
+
+List handlers select plain columns and hand the row dicts straight to
+orjson, skipping ORM entity loading, per-field pydantic construction and
+response_model re-validation. UUIDs and datetimes are encoded natively (same
+text as str() / isoformat()); Decimals become strings, like str(value).
+"""
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+import orjson
+from starlette.responses import Response
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+loads = orjson.loads
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered by orjson, with Decimal support"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def row_dicts(rows, keys: Sequence[str]) -> List[dict]:
+    """Row tuples as dicts keyed by `keys` (in select() column order)"""
+    return [dict(zip(keys, row)) for row in rows]
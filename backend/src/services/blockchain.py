@@ -1,44 +1,194 @@
 """Blockchain interaction service"""
-from web3 import Web3
-from typing import Optional, Dict, Any
-import json
+import asyncio
+import itertools
+import time
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from eth_abi import decode, encode
+from web3 import AsyncWeb3, AsyncHTTPProvider, Web3
 
 from src.config import settings
+from src.instrumentation import record_rpc
+
+
+def _selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+IS_PAYMENT_PROCESSED = _selector("isPaymentProcessed(bytes32)")
+MULTICALL3_AGGREGATE3 = _selector("aggregate3((address,bool,bytes)[])")
+
+
+class BlockchainRPCError(Exception):
+    """A JSON-RPC call (or a whole batch) returned an error"""
+
+
+def _hex_to_int(value: Optional[str]) -> Optional[int]:
+    return int(value, 16) if value is not None else None
+
+
+def _format_transaction(tx_hash: str, tx: Optional[dict], receipt: Optional[dict]) -> Optional[Dict[str, Any]]:
+    """Shape raw eth_getTransactionByHash/eth_getTransactionReceipt results like get_transaction()"""
+    if tx is None:
+        return None
+    return {
+        "hash": tx_hash,
+        "from": Web3.to_checksum_address(tx["from"]),
+        "to": Web3.to_checksum_address(tx["to"]) if tx.get("to") else None,
+        "value": _hex_to_int(tx["value"]),
+        # No receipt yet means the transaction is still pending
+        "status": _hex_to_int(receipt["status"]) if receipt else None,
+        "block_number": _hex_to_int(receipt["blockNumber"]) if receipt else None,
+        "gas_used": _hex_to_int(receipt["gasUsed"]) if receipt else None
+    }
 
 
 class BlockchainService:
-    """Service for interacting with Monad blockchain"""
-    
-    def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(settings.MONAD_RPC_URL))
+    """Service for interacting with Monad blockchain
+
+    Uses one keep-alive aiohttp session per instance, so RPC calls reuse
+    pooled TCP/TLS connections; in-flight calls are capped by a semaphore.
+    Use get_blockchain_service() for the shared instance.
+    """
+
+    def __init__(
+        self,
+        rpc_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        self.rpc_url = rpc_url or settings.MONAD_RPC_URL
         self.chain_id = settings.MONAD_CHAIN_ID
-    
-    def get_balance(self, address: str, token_address: Optional[str] = None) -> int:
+        self.timeout = ClientTimeout(total=timeout or settings.RPC_TIMEOUT)
+        self.max_connections = max_connections or settings.RPC_MAX_CONNECTIONS
+        self.batch_size = settings.RPC_BATCH_SIZE
+        self.multicall_address = settings.MULTICALL3_ADDRESS or None
+        self.multicall_chunk_size = settings.MULTICALL_CHUNK_SIZE
+        self._request_ids = itertools.count(1)
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(self.rpc_url, request_kwargs={"timeout": self.timeout}))
+        self._session: Optional[ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.RPC_MAX_CONCURRENCY)
+
+    async def _ensure_session(self) -> ClientSession:
+        """Create the pooled HTTP session on first use (it must live on the running loop)"""
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    session = ClientSession(
+                        connector=TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                        timeout=self.timeout,
+                    )
+                    await self.w3.provider.cache_async_session(session)
+                    self._session = session
+        return self._session
+
+    async def _rpc(self, awaitable_factory):
+        """Run one RPC call on the pooled session, within the concurrency limit"""
+        await self._ensure_session()
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                return await awaitable_factory()
+            finally:
+                record_rpc(started)
+
+    async def _post_batch(self, calls: Sequence[Tuple[str, list]], allow_errors: bool = False) -> List[Any]:
+        """Send one JSON-RPC batch request and return results in call order"""
+        session = await self._ensure_session()
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._request_ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                async with session.post(self.rpc_url, json=payload) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json(content_type=None)
+            finally:
+                record_rpc(started)
+
+        if not isinstance(data, list):
+            # Providers answer a rejected batch (e.g. rate limited) with a single error object
+            error = data.get("error") if isinstance(data, dict) else data
+            raise BlockchainRPCError(f"Batch request rejected: {error}")
+
+        by_id = {item.get("id"): item for item in data}
+        results = []
+        for call in payload:
+            item = by_id.get(call["id"])
+            if item is None:
+                raise BlockchainRPCError(f"Missing response for {call['method']}")
+            if "error" in item:
+                if allow_errors:
+                    results.append(None)
+                    continue
+                raise BlockchainRPCError(f"{call['method']} failed: {item['error']}")
+            results.append(item.get("result"))
+        return results
+
+    async def rpc_batch(self, calls: Sequence[Tuple[str, list]], allow_errors: bool = False) -> List[Any]:
+        """Run many JSON-RPC calls as batch requests of RPC_BATCH_SIZE
+
+        Chunks are sent concurrently (bounded by RPC_MAX_CONCURRENCY) and
+        results are returned in call order. With `allow_errors`, a failed
+        call yields None instead of raising.
+        """
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        chunk_results = await asyncio.gather(*(self._post_batch(chunk, allow_errors) for chunk in chunks))
+        return [result for chunk in chunk_results for result in chunk]
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_balance(self, address: str, token_address: Optional[str] = None) -> int:
         """Get balance for address (native or ERC20)"""
         if token_address is None:
             # Native token balance
-            return self.w3.eth.get_balance(address)
+            return await self._rpc(lambda: self.w3.eth.get_balance(address))
         else:
             # ERC20 token balance
             # Simplified - would need ERC20 ABI
             return 0
-    
-    def get_transaction(self, tx_hash: str) -> Dict[str, Any]:
+
+    async def get_balances(self, addresses: Sequence[str], block: str = "latest") -> Dict[str, int]:
+        """Native balances for many addresses, batched"""
+        results = await self.rpc_batch([("eth_getBalance", [address, block]) for address in addresses])
+        return {address: _hex_to_int(balance) for address, balance in zip(addresses, results)}
+
+    async def get_transaction(self, tx_hash: str) -> Dict[str, Any]:
         """Get transaction details"""
-        tx = self.w3.eth.get_transaction(tx_hash)
-        receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-        
+        # Transaction and receipt travel in one batch round trip
+        tx, receipt = await self.rpc_batch([
+            ("eth_getTransactionByHash", [tx_hash]),
+            ("eth_getTransactionReceipt", [tx_hash]),
+        ])
+        if tx is None:
+            raise BlockchainRPCError(f"Transaction {tx_hash} not found")
+        return _format_transaction(tx_hash, tx, receipt)
+
+    async def get_transactions(self, tx_hashes: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Transaction details for many hashes, batched
+
+        Unknown hashes map to None; pending transactions have status None.
+        """
+        calls = []
+        for tx_hash in tx_hashes:
+            calls.append(("eth_getTransactionByHash", [tx_hash]))
+            calls.append(("eth_getTransactionReceipt", [tx_hash]))
+        results = await self.rpc_batch(calls)
         return {
-            "hash": tx_hash,
-            "from": tx["from"],
-            "to": tx["to"],
-            "value": tx["value"],
-            "status": receipt["status"],
-            "block_number": receipt["blockNumber"],
-            "gas_used": receipt["gasUsed"]
+            tx_hash: _format_transaction(tx_hash, results[2 * i], results[2 * i + 1])
+            for i, tx_hash in enumerate(tx_hashes)
         }
-    
-    def verify_payment(
+
+    async def verify_payment(
         self,
         payment_id: str,
         x402_handler_address: str,
@@ -49,12 +199,96 @@ class BlockchainService:
             address=x402_handler_address,
             abi=x402_handler_abi
         )
-        
+
         try:
-            is_processed = contract.functions.isPaymentProcessed(
-                Web3.to_bytes(hexstr=payment_id)
-            ).call()
+            is_processed = await self._rpc(
+                lambda: contract.functions.isPaymentProcessed(
+                    Web3.to_bytes(hexstr=payment_id)
+                ).call()
+            )
             return is_processed
         except Exception:
             return False
 
+    async def aggregate_calls(self, calls: Sequence[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+        """Run many read-only (target, calldata) calls with as few round trips as possible
+
+        With MULTICALL3_ADDRESS set, calls are packed into Multicall3
+        aggregate3 eth_calls of MULTICALL_CHUNK_SIZE (which themselves go out
+        as one JSON-RPC batch); otherwise each call is its own eth_call inside
+        JSON-RPC batches. Failed calls come back as None.
+        """
+        if not calls:
+            return []
+
+        if not self.multicall_address:
+            eth_calls = [
+                ("eth_call", [{"to": target, "data": "0x" + data.hex()}, "latest"])
+                for target, data in calls
+            ]
+            results = await self.rpc_batch(eth_calls, allow_errors=True)
+            return [Web3.to_bytes(hexstr=r) if r else None for r in results]
+
+        chunks = [
+            calls[i:i + self.multicall_chunk_size]
+            for i in range(0, len(calls), self.multicall_chunk_size)
+        ]
+        eth_calls = []
+        for chunk in chunks:
+            data = MULTICALL3_AGGREGATE3 + encode(
+                ["(address,bool,bytes)[]"],
+                [[(target, True, calldata) for target, calldata in chunk]],
+            )
+            eth_calls.append(("eth_call", [{"to": self.multicall_address, "data": "0x" + data.hex()}, "latest"]))
+
+        results: List[Optional[bytes]] = []
+        for raw in await self.rpc_batch(eth_calls):
+            (returned,) = decode(["(bool,bytes)[]"], Web3.to_bytes(hexstr=raw))
+            results.extend(return_data if success else None for success, return_data in returned)
+        return results
+
+    async def verify_payments(
+        self,
+        payment_ids: Sequence[str],
+        x402_handler_address: Optional[str] = None
+    ) -> Dict[str, bool]:
+        """Bulk verify_payment: {payment_id: processed} via aggregated isPaymentProcessed calls"""
+        handler = x402_handler_address or settings.X402_PAYMENT_CONTRACT
+        if not handler:
+            raise ValueError("X402_PAYMENT_CONTRACT is not configured")
+        handler = Web3.to_checksum_address(handler)
+
+        results = {payment_id: False for payment_id in payment_ids}
+        calls, checked_ids = [], []
+        for payment_id in payment_ids:
+            try:
+                payment_key = Web3.to_bytes(hexstr=payment_id)
+                calldata = IS_PAYMENT_PROCESSED + encode(["bytes32"], [payment_key])
+            except Exception:
+                # Not a bytes32 payment ID; it can't be processed on-chain
+                continue
+            calls.append((handler, calldata))
+            checked_ids.append(payment_id)
+
+        for payment_id, data in zip(checked_ids, await self.aggregate_calls(calls)):
+            results[payment_id] = bool(data) and decode(["bool"], data)[0]
+        return results
+
+
+_blockchain_service: Optional[BlockchainService] = None
+
+
+def get_blockchain_service() -> BlockchainService:
+    """Shared BlockchainService (also usable as a FastAPI dependency)"""
+    global _blockchain_service
+    if _blockchain_service is None:
+        _blockchain_service = BlockchainService()
+    return _blockchain_service
+
+
+async def close_blockchain_service():
+    """Close the shared service's connection pool (app shutdown)"""
+    global _blockchain_service
+    if _blockchain_service is not None:
+        await _blockchain_service.close()
+        _blockchain_service = None
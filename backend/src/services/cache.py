@@ -0,0 +1,323 @@
+"""Caches for marketplace listings and payment verification"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config import settings
+from src.serialization import dumps, loads
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional for local development
+    aioredis = None
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL, used when Redis is not reachable"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int]):
+        """Store `value`; ttl None keeps it until evicted"""
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str):
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Redis-backed cache shared across workers"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int]):
+        await self.client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str):
+        await self.client.unlink(*keys)
+
+    async def delete_prefix(self, prefix: str):
+        keys = [key async for key in self.client.scan_iter(match=f"{prefix}*", count=500)]
+        if keys:
+            await self.client.unlink(*keys)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def connect_redis_backend(redis_url: Optional[str], purpose: str) -> Optional[RedisCacheBackend]:
+    """Redis backend if REDIS_URL answers a ping, otherwise None"""
+    if not redis_url or aioredis is None:
+        return None
+    client = aioredis.from_url(
+        redis_url,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+    try:
+        await client.ping()
+        return RedisCacheBackend(client)
+    except Exception as e:
+        print(f"⚠️  Redis unavailable for {purpose} ({e.__class__.__name__}), using in-process cache")
+        await client.aclose()
+        return None
+
+
+class ListingCache:
+    """Caches listing pages keyed by their query parameters.
+
+    Uses Redis when REDIS_URL is reachable and falls back to an in-process
+    cache otherwise. Scopes in `local_scopes` (scope -> max entries) have an
+    open-ended key space, like search terms, and are only kept in a bounded
+    per-worker LRU. Cache errors never fail a request; the loader is used instead.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        ttl: int,
+        enabled: bool = True,
+        namespace: str = "listings",
+        local_scopes: Optional[Dict[str, int]] = None
+    ):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.enabled = enabled
+        self.namespace = namespace
+        self._backend = None
+        self._backend_lock = asyncio.Lock()
+        self._local = {scope: MemoryCacheBackend(max_entries) for scope, max_entries in (local_scopes or {}).items()}
+
+    async def _get_backend(self):
+        if self._backend is not None:
+            return self._backend
+        async with self._backend_lock:
+            if self._backend is None:
+                self._backend = await self._connect()
+        return self._backend
+
+    async def _connect(self):
+        return await connect_redis_backend(self.redis_url, "listing cache") or MemoryCacheBackend()
+
+    async def _backend_for(self, scope: str):
+        if scope in self._local:
+            return self._local[scope]
+        return await self._get_backend()
+
+    def _key(self, scope: str, *parts: Any) -> str:
+        return ":".join([self.namespace, scope, *("" if p is None else str(p) for p in parts)])
+
+    async def get_or_load(self, scope: str, key_parts: tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for (scope, key_parts), loading and storing it on a miss"""
+        if not self.enabled:
+            return await loader()
+
+        key = self._key(scope, *key_parts)
+        backend = await self._backend_for(scope)
+        try:
+            cached = await backend.get(key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return loads(cached)
+
+        value = await loader()
+        try:
+            await backend.set(key, dumps(value).decode(), self.ttl)
+        except Exception:
+            pass
+        return value
+
+    async def invalidate(self, scope: Optional[str] = None):
+        """Drop cached pages for one scope, or all listings"""
+        if not self.enabled:
+            return
+        if scope:
+            backends = [await self._backend_for(scope)]
+            prefix = f"{self._key(scope)}:"
+        else:
+            backends = [await self._get_backend(), *self._local.values()]
+            prefix = f"{self.namespace}:"
+        for backend in backends:
+            try:
+                await backend.delete_prefix(prefix)
+            except Exception as e:
+                print(f"⚠️  Could not invalidate listing cache: {e}")
+
+    async def close(self):
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+
+class PaymentVerificationCache:
+    """Caches verify_payment outcomes by payment ID.
+
+    Confirmed entries live for confirmed_ttl seconds in a bounded in-process
+    LRU and, when REDIS_URL is reachable, in Redis shared by all workers.
+    A reorg can revert a confirmed payment; forget() clears Redis and this
+    worker's LRU, other workers' local copies expire within confirmed_ttl.
+    Unknown payment IDs are cached negatively for a few seconds only. Local
+    hits skip Redis entirely.
+    """
+
+    CONFIRMED = "1"
+    MISSING = "0"
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        max_entries: int,
+        confirmed_ttl: int,
+        negative_ttl: int,
+        enabled: bool = True,
+        namespace: str = "payments:verified"
+    ):
+        self.redis_url = redis_url
+        self.confirmed_ttl = confirmed_ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self.namespace = namespace
+        self._local = MemoryCacheBackend(max_entries=max_entries)
+        self._shared: Optional[RedisCacheBackend] = None
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    async def _get_shared(self) -> Optional[RedisCacheBackend]:
+        if not self._connected:
+            async with self._connect_lock:
+                if not self._connected:
+                    self._shared = await connect_redis_backend(self.redis_url, "payment cache")
+                    self._connected = True
+        return self._shared
+
+    def _key(self, payment_id: str) -> str:
+        return f"{self.namespace}:{payment_id}"
+
+    async def get(self, payment_id: str) -> Optional[bool]:
+        """True (confirmed) / False (unknown) when cached, None on a miss"""
+        if not self.enabled:
+            return None
+        key = self._key(payment_id)
+        value = await self._local.get(key)
+        if value is None:
+            shared = await self._get_shared()
+            if shared is not None:
+                try:
+                    value = await shared.get(key)
+                except Exception:
+                    value = None
+                if value == self.CONFIRMED:
+                    await self._local.set(key, value, self.confirmed_ttl)
+                elif value == self.MISSING:
+                    await self._local.set(key, value, self.negative_ttl)
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if value == self.MISSING:
+            self.negative_hits += 1
+        return value == self.CONFIRMED
+
+    async def _set(self, payment_id: str, value: str, ttl: Optional[int]):
+        if not self.enabled:
+            return
+        key = self._key(payment_id)
+        await self._local.set(key, value, ttl)
+        shared = await self._get_shared()
+        if shared is not None:
+            try:
+                await shared.set(key, value, ttl)
+            except Exception:
+                pass
+
+    async def set_confirmed(self, payment_id: str):
+        await self._set(payment_id, self.CONFIRMED, self.confirmed_ttl)
+
+    async def set_missing(self, payment_id: str):
+        await self._set(payment_id, self.MISSING, self.negative_ttl)
+
+    async def forget(self, *payment_ids: str):
+        """Drop any cached outcome (the payments were just recorded or changed)"""
+        if not self.enabled or not payment_ids:
+            return
+        keys = [self._key(payment_id) for payment_id in payment_ids]
+        await self._local.delete(*keys)
+        shared = await self._get_shared()
+        if shared is not None:
+            try:
+                await shared.delete(*keys)
+            except Exception as e:
+                print(f"⚠️  Could not invalidate payment cache: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": "redis" if self._shared is not None else "memory",
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "local_entries": len(self._local),
+        }
+
+    async def close(self):
+        if self._shared is not None:
+            await self._shared.close()
+        self._shared = None
+        self._connected = False
+
+
+listing_cache = ListingCache(
+    redis_url=settings.REDIS_URL,
+    ttl=settings.LISTING_CACHE_TTL,
+    enabled=settings.LISTING_CACHE_ENABLED,
+    local_scopes={"search": settings.SEARCH_CACHE_MAX_ENTRIES},
+)
+
+payment_cache = PaymentVerificationCache(
+    redis_url=settings.REDIS_URL,
+    max_entries=settings.PAYMENT_CACHE_MAX_ENTRIES,
+    confirmed_ttl=settings.PAYMENT_CACHE_CONFIRMED_TTL,
+    negative_ttl=settings.PAYMENT_CACHE_NEGATIVE_TTL,
+    enabled=settings.PAYMENT_CACHE_ENABLED,
+)
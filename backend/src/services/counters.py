@@ -0,0 +1,213 @@
+"""Buffered service usage counters and rating aggregates"""
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import bindparam, case, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import func
+
+from src.config import settings
+from src.database import AsyncSessionLocal, dialect_insert
+from src.models import Service, ServiceRating
+from src.services.cache import RedisCacheBackend, connect_redis_backend, listing_cache
+
+COUNTER_FIELDS = ("call_count", "rating_sum", "rating_count")
+
+services_table = Service.__table__
+_rating_sum = services_table.c.rating_sum + bindparam("_rating_sum")
+_rating_count = services_table.c.rating_count + bindparam("_rating_count")
+
+# SET expressions read the pre-update row, so concurrent flushers (and other
+# workers) add to whatever is committed. The average is truncated to two
+# decimals like Market.rateService (totalRating * RATING_SCALE / ratingCount).
+APPLY_DELTAS = (
+    update(services_table)
+    .where(services_table.c.id == bindparam("_id"))
+    .values(
+        call_count=func.coalesce(services_table.c.call_count, 0) + bindparam("_call_count"),
+        rating_sum=_rating_sum,
+        rating_count=_rating_count,
+        rating=case(
+            (_rating_count > 0, (_rating_sum * 100 // _rating_count) * literal_column("0.01")),
+            else_=services_table.c.rating,
+        ),
+    )
+)
+
+Delta = Tuple[str, str, int]  # (service_id, field, amount)
+
+
+class ServiceCounters:
+    """Accumulates per-service counter deltas and writes them in batches
+
+    Payments and ratings add deltas here instead of updating `services`
+    directly, so a popular service's row is written once per flush rather
+    than once per payment. Deltas are kept in a Redis hash shared by all
+    workers when REDIS_URL is reachable (they survive a worker restart),
+    otherwise in process memory. flush() swaps the pending deltas out and
+    applies them with one executemany UPDATE in service id order, so
+    concurrent flushers lock rows in the same order; deltas of a failed
+    flush are put back.
+    """
+
+    def __init__(self, redis_url: Optional[str], namespace: str = "counters:services"):
+        self.redis_url = redis_url
+        self.namespace = namespace
+        self._pending: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._shared: Optional[RedisCacheBackend] = None
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
+        self.flushes = 0
+        self.rows_updated = 0
+
+    async def _get_shared(self) -> Optional[RedisCacheBackend]:
+        if not self._connected:
+            async with self._connect_lock:
+                if not self._connected:
+                    self._shared = await connect_redis_backend(self.redis_url, "service counters")
+                    self._connected = True
+        return self._shared
+
+    async def _add(self, deltas: Iterable[Delta]):
+        deltas = [(str(service_id), field, amount) for service_id, field, amount in deltas if amount]
+        if not deltas:
+            return
+        shared = await self._get_shared()
+        if shared is not None:
+            try:
+                pipe = shared.client.pipeline(transaction=False)
+                for service_id, field, amount in deltas:
+                    pipe.hincrby(self.namespace, f"{service_id}:{field}", amount)
+                await pipe.execute()
+                return
+            except Exception as e:
+                print(f"⚠️  Service counters: Redis write failed ({e.__class__.__name__}), buffering in memory")
+        for service_id, field, amount in deltas:
+            self._pending[(service_id, field)] += amount
+
+    async def add_calls(self, call_counts: Mapping[str, int]):
+        """Count service calls, e.g. {service_id: 3}"""
+        await self._add((service_id, "call_count", count) for service_id, count in call_counts.items())
+
+    async def add_rating(self, service_id: str, rating_delta: int, count_delta: int):
+        """Adjust a service's rating sum and count"""
+        await self._add([(service_id, "rating_sum", rating_delta), (service_id, "rating_count", count_delta)])
+
+    async def _take(self) -> Tuple[Dict[Tuple[str, str], int], Optional[str]]:
+        """Swap out everything pending; returns the deltas and the Redis key holding them"""
+        taken, self._pending = self._pending, defaultdict(int)
+        shared = await self._get_shared()
+        if shared is None:
+            return taken, None
+
+        # RENAME is atomic: each delta is taken by exactly one flusher across workers
+        flushing_key = f"{self.namespace}:flushing:{uuid.uuid4().hex}"
+        try:
+            await shared.client.rename(self.namespace, flushing_key)
+        except Exception:
+            # No such key: nothing was counted through Redis since the last flush
+            return taken, None
+        for key, amount in (await shared.client.hgetall(flushing_key)).items():
+            service_id, _, field = key.rpartition(":")
+            taken[(service_id, field)] += int(amount)
+        return taken, flushing_key
+
+    async def flush(self, session_factory: Optional[async_sessionmaker] = None) -> int:
+        """Apply pending deltas; returns the number of services updated"""
+        taken, flushing_key = await self._take()
+        if not taken:
+            return 0
+
+        rows: Dict[str, Dict[str, int]] = {}
+        for (service_id, field), amount in taken.items():
+            row = rows.setdefault(service_id, {"_id": uuid.UUID(service_id), **{f"_{f}": 0 for f in COUNTER_FIELDS}})
+            row[f"_{field}"] += amount
+        params = [rows[service_id] for service_id in sorted(rows)]
+
+        try:
+            async with (session_factory or AsyncSessionLocal)() as db:
+                await db.execute(APPLY_DELTAS, params)
+                await db.commit()
+        except Exception:
+            # Put the deltas back for the next flush
+            await self._add((service_id, field, amount) for (service_id, field), amount in taken.items())
+            raise
+        finally:
+            if flushing_key is not None and self._shared is not None:
+                await self._shared.client.unlink(flushing_key)
+
+        self.flushes += 1
+        self.rows_updated += len(params)
+        if any(row["_rating_count"] or row["_rating_sum"] for row in params):
+            # Ratings change listing order
+            await listing_cache.invalidate()
+        return len(params)
+
+    async def run_forever(self, interval: Optional[float] = None):
+        """Flush every `interval` seconds until cancelled, then once more"""
+        interval = interval or settings.SERVICE_COUNTERS_FLUSH_INTERVAL
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"⚠️  Service counter flush failed: {e}")
+        finally:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️  Final service counter flush failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis" if self._shared is not None else "memory",
+            "pending_local": len(self._pending),
+            "flushes": self.flushes,
+            "rows_updated": self.rows_updated,
+        }
+
+    async def close(self):
+        if self._shared is not None:
+            await self._shared.close()
+        self._shared = None
+        self._connected = False
+
+
+async def record_rating(
+    db: AsyncSession,
+    service_id: uuid.UUID,
+    rater_address: str,
+    rating: int,
+    comment: Optional[str] = None
+) -> Tuple[int, int]:
+    """Store a rater's rating like Market.rateService and buffer the aggregate change
+
+    A first rating adds (rating, 1) to the service's sum and count; rating
+    again replaces the previous value and adds only the difference. Returns
+    (rating_delta, count_delta). Commits the session.
+    """
+    result = await db.execute(
+        dialect_insert(ServiceRating)
+        .values(service_id=service_id, rater_address=rater_address, rating=rating, comment=comment)
+        .on_conflict_do_nothing()
+        .returning(ServiceRating.rating)
+    )
+    if result.scalar() is not None:
+        delta = (rating, 1)
+    else:
+        key = (ServiceRating.service_id == service_id) & (ServiceRating.rater_address == rater_address)
+        # Locked so two concurrent re-ratings by the same rater can't both use the same old value
+        result = await db.execute(select(ServiceRating.rating).where(key).with_for_update())
+        previous = result.scalar_one()
+        await db.execute(update(ServiceRating).where(key).values(rating=rating, comment=comment))
+        delta = (rating - previous, 0)
+    await db.commit()
+
+    await service_counters.add_rating(str(service_id), *delta)
+    return delta
+
+
+service_counters = ServiceCounters(redis_url=settings.REDIS_URL)
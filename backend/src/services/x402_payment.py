@@ -1,38 +1,56 @@
 """x402 payment service"""
-from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
+from collections import Counter
+from typing import Dict, Any, List, Optional, Sequence, Set
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.services.blockchain import BlockchainService
+from src.database import dialect_insert
+from src.services.blockchain import BlockchainService, get_blockchain_service
+from src.services.cache import payment_cache
+from src.services.counters import service_counters
+from src.models.agent import Agent
 from src.models.payment import Payment
+from src.models.service import Service
 from src.config import settings
 
 
 class X402PaymentService:
     """Service for handling x402 payments"""
-    
-    def __init__(self):
-        self.blockchain = BlockchainService()
-    
-    def verify_payment(
+
+    def __init__(self, blockchain: Optional[BlockchainService] = None):
+        # Share the pooled RPC client instead of opening a new one per instance
+        self.blockchain = blockchain or get_blockchain_service()
+
+    async def verify_payment(
         self,
         payment_id: str,
-        db: Session
+        db: AsyncSession
     ) -> bool:
         """Verify x402 payment"""
+        # Confirmed payments and unknown IDs are answered from the cache
+        cached = await payment_cache.get(payment_id)
+        if cached is not None:
+            return cached
+
         # Check if payment exists in database
-        payment = db.query(Payment).filter(
-            Payment.payment_id == payment_id
-        ).first()
-        
-        if payment and payment.status == "confirmed":
+        result = await db.execute(
+            select(Payment.status).where(Payment.payment_id == payment_id)
+        )
+        status = result.scalar_one_or_none()
+
+        if status == "confirmed":
+            await payment_cache.set_confirmed(payment_id)
             return True
-        
+        if status is None:
+            await payment_cache.set_missing(payment_id)
+            return False
+
         # Verify on-chain
         # This would require x402 handler ABI
-        # For now, return True if payment exists
-        return payment is not None
-    
-    def record_payment(
+        # For now, return True if payment exists (not cached: the status can still change)
+        return True
+
+    async def record_payment(
         self,
         payment_id: str,
         tx_hash: str,
@@ -40,7 +58,7 @@ class X402PaymentService:
         payment_type: str,
         agent_id: Optional[str] = None,
         service_id: Optional[str] = None,
-        db: Session = None
+        db: AsyncSession = None
     ) -> Payment:
         """Record payment in database"""
         payment = Payment(
@@ -52,28 +70,137 @@ class X402PaymentService:
             service_id=service_id,
             status="pending"
         )
-        
+
         db.add(payment)
-        db.commit()
-        db.refresh(payment)
-        
+        # created_at is fetched by the INSERT itself (eager_defaults)
+        await db.commit()
+        # A negative entry from an earlier lookup is now stale
+        await payment_cache.forget(payment_id)
+        if service_id and payment_type == "service_call":
+            await service_counters.add_calls({service_id: 1})
+
         return payment
-    
-    def update_payment_status(
+
+    async def record_payments(
+        self,
+        payments: Sequence[Dict[str, Any]],
+        db: AsyncSession
+    ) -> List[str]:
+        """Record many payments with one INSERT ... ON CONFLICT (payment_id) DO NOTHING RETURNING
+
+        Each item needs payment_id, tx_hash, amount and payment_type, and may
+        carry agent_id/service_id. Returns one status per item, in order:
+        "created", "duplicate" (payment_id already recorded or repeated in
+        the batch), "conflict" (tx_hash belongs to another payment) or
+        "invalid" (agent_id/service_id does not exist). Items that are not
+        "created" are classified up front, so they never reach the INSERT
+        and cannot fail the batch on a constraint.
+        """
+        rows = {}
+        for payment in payments:
+            rows.setdefault(payment["payment_id"], {
+                "payment_id": payment["payment_id"],
+                "tx_hash": payment["tx_hash"],
+                "amount": payment["amount"],
+                "payment_type": payment["payment_type"],
+                "agent_id": payment.get("agent_id"),
+                "service_id": payment.get("service_id"),
+                "status": "pending",
+            })
+        if not rows:
+            return []
+
+        invalid = await self._unknown_references(rows.values(), db)
+
+        # Payment IDs and tx hashes already recorded, in one lookup
+        tx_hashes = {row["tx_hash"] for row in rows.values()}
+        result = await db.execute(
+            select(Payment.payment_id, Payment.tx_hash)
+            .where(or_(Payment.payment_id.in_(list(rows)), Payment.tx_hash.in_(tx_hashes)))
+        )
+        existing = set()
+        tx_owners = {}
+        for payment_id, tx_hash in result:
+            existing.add(payment_id)
+            tx_owners[tx_hash] = payment_id
+
+        conflicting = set()
+        inserts = []
+        for payment_id, row in rows.items():
+            if payment_id in existing or payment_id in invalid:
+                continue
+            # First payment_id claiming a tx_hash (in the table or this batch) keeps it
+            owner = tx_owners.setdefault(row["tx_hash"], payment_id)
+            if owner != payment_id:
+                conflicting.add(payment_id)
+            else:
+                inserts.append(row)
+
+        created = set()
+        if inserts:
+            result = await db.execute(
+                dialect_insert(Payment)
+                .on_conflict_do_nothing(index_elements=["payment_id"])
+                .returning(Payment.payment_id),
+                inserts
+            )
+            created = set(result.scalars().all())
+        await db.commit()
+        await payment_cache.forget(*created)
+        call_counts = Counter(
+            row["service_id"] for payment_id, row in rows.items()
+            if payment_id in created and row["service_id"] and row["payment_type"] == "service_call"
+        )
+        await service_counters.add_calls(call_counts)
+
+        statuses = []
+        for payment in payments:
+            payment_id = payment["payment_id"]
+            if payment_id in created:
+                statuses.append("created")
+                # Later repeats of the same payment_id in this batch
+                created.discard(payment_id)
+                existing.add(payment_id)
+            elif payment_id in invalid and payment_id not in existing:
+                statuses.append("invalid")
+            elif payment_id in conflicting:
+                statuses.append("conflict")
+            else:
+                # Recorded before, or by a concurrent request since the lookup
+                statuses.append("duplicate")
+        return statuses
+
+    async def _unknown_references(self, rows, db: AsyncSession) -> Set[str]:
+        """payment_ids whose agent_id or service_id has no row, one SELECT per referenced table"""
+        invalid = set()
+        for model, key in ((Agent, "agent_id"), (Service, "service_id")):
+            ids = {row[key] for row in rows if row[key] is not None}
+            if not ids:
+                continue
+            result = await db.execute(select(model.id).where(model.id.in_(ids)))
+            unknown = ids - set(result.scalars().all())
+            invalid.update(row["payment_id"] for row in rows if row[key] in unknown)
+        return invalid
+
+    async def update_payment_status(
         self,
         payment_id: str,
         status: str,
         block_number: Optional[int] = None,
-        db: Session = None
+        db: AsyncSession = None
     ):
         """Update payment status"""
-        payment = db.query(Payment).filter(
-            Payment.payment_id == payment_id
-        ).first()
-        
+        result = await db.execute(
+            select(Payment).where(Payment.payment_id == payment_id)
+        )
+        payment = result.scalar_one_or_none()
+
         if payment:
             payment.status = status
             if block_number:
                 payment.block_number = block_number
-            db.commit()
-
+            await db.commit()
+            if status == "confirmed":
+                await payment_cache.set_confirmed(payment_id)
+            else:
+                await payment_cache.forget(payment_id)
@@ -0,0 +1,184 @@
+"""
+Startup tasks run from the app lifespan.
+
+STARTUP_MODE selects what a worker does before serving:
+- create_all: create the tables of an empty database and seed mock data
+              (default, zero setup); existing databases are migrated instead
+- migrate:    apply Alembic migrations, skipped when the DB is already at head
+- seed:       only seed mock data if missing
+- none:       nothing; schema and data are managed out of band
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from sqlalchemy import inspect, text
+
+from src.database import Base, SessionLocal, engine
+from src.models import User
+from src.seed import TARGET_WALLET, seed_mock_data
+
+STARTUP_MODES = ("create_all", "migrate", "seed", "none")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+# Revision matching the schema Base.metadata.create_all produced before
+# migrations existed; such databases are stamped here on first migrate.
+BASELINE_REVISION = "0001"
+
+# pg_advisory_lock key held while migrating (any constant unique to this app)
+MIGRATION_LOCK_KEY = 4020001
+
+
+def check_and_seed_mock_data():
+    """Check if mock data exists, if not, seed it"""
+    try:
+        db = SessionLocal()
+        user = db.query(User).filter(User.wallet_address == TARGET_WALLET).first()
+
+        if not user:
+            print("🌱 Mock data not found, seeding...")
+            seed_mock_data(db, with_activity=False)
+            print("✅ Mock data seeded successfully!")
+        else:
+            print("ℹ️  Mock data already exists, skipping seed")
+        db.close()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not check/seed mock data: {e}")
+        import traceback
+        traceback.print_exc()
+        print("   You may need to run 'python init_db.py' manually")
+
+
+def create_tables():
+    """Create the schema of an empty database; migrate an existing one
+
+    create_all only adds missing tables and never alters existing ones, so
+    a database from an earlier release would keep a stale schema. Those go
+    through migrate() (stamped at the baseline if they have no migration
+    history; the migrations are idempotent for create_all-built schemas).
+    """
+    with engine.connect() as conn:
+        existing = inspect(conn).has_table("users")
+    if existing:
+        print("ℹ️  Existing database, applying migrations instead of create_all")
+        migrate()
+        return
+    Base.metadata.create_all(bind=engine)
+    print("✅ Database tables initialized successfully!")
+    print("   Tables: users, agents, services, transactions, payments, indexer_checkpoints")
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def _current_revision(conn) -> Optional[str]:
+    """Read the applied revision; None if migrations were never run"""
+    if not inspect(conn).has_table("alembic_version"):
+        return None
+    return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+@contextmanager
+def _migration_lock() -> Iterator[None]:
+    """Hold a lock that serializes migrate() across workers and hosts
+
+    PostgreSQL: a session-level advisory lock on its own connection.
+    SQLite: an exclusive flock on a file next to the database. Other
+    databases (and in-memory SQLite) run unlocked.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            # Session-level lock: it outlives this transaction, don't sit idle in one
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        return
+
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:":
+        yield
+        return
+
+    import fcntl
+
+    with open(f"{database}.migrate.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migrate():
+    """Upgrade to the latest Alembic revision unless the schema is already current
+
+    Workers starting together all call this: the revision is checked
+    without a lock first (the common, already-current case), then again
+    under _migration_lock(), so only the first worker to get the lock
+    upgrades and the rest see the new revision.
+    """
+    from alembic.script import ScriptDirectory
+
+    config = _alembic_config()
+    head = ScriptDirectory.from_config(config).get_current_head()
+
+    with engine.connect() as conn:
+        if _current_revision(conn) == head:
+            print(f"✅ Database schema is current (revision {head})")
+            return
+
+    with _migration_lock():
+        _upgrade(config, head)
+
+
+def _upgrade(config, head: str):
+    from alembic import command
+
+    with engine.begin() as conn:
+        current = _current_revision(conn)
+        if current == head:
+            print(f"✅ Database schema is current (revision {head}, migrated by another worker)")
+            return
+
+        config.attributes["connection"] = conn
+        if current is None and inspect(conn).has_table("users"):
+            print(f"ℹ️  Existing schema without migration history, stamping {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+            current = BASELINE_REVISION
+        print(f"🔧 Migrating database schema {current or 'empty'} -> {head}")
+        command.upgrade(config, "head")
+    print("✅ Database migrations applied")
+
+
+def run_startup_tasks(mode: str) -> Dict[str, float]:
+    """Run the startup tasks for `mode` and return per-step timings in milliseconds"""
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"Unknown STARTUP_MODE {mode!r}, expected one of {', '.join(STARTUP_MODES)}")
+
+    steps: Dict[str, Callable[[], None]] = {}
+    if mode == "create_all":
+        steps = {"create_all": create_tables, "seed": check_and_seed_mock_data}
+    elif mode == "migrate":
+        steps = {"migrate": migrate}
+    elif mode == "seed":
+        steps = {"seed": check_and_seed_mock_data}
+
+    timings: Dict[str, float] = {}
+    total_start = time.perf_counter()
+    for name, step in steps.items():
+        start = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    timings["total"] = round((time.perf_counter() - total_start) * 1000, 1)
+    return timings
@@ -0,0 +1,96 @@
+"""
+Celery app for background jobs.
+
+Run a worker with the beat scheduler:
+
+    celery -A src.workers.celery_app worker -B --loglevel=info
+
+CELERY_BROKER_URL=memory:// runs tasks eagerly in the calling process, for
+tests and local development without a broker.
+"""
+import asyncio
+from typing import Dict, Optional
+from uuid import UUID
+
+from celery import Celery
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.config import settings
+from src.database import async_database_url
+from src.services.blockchain import BlockchainService
+from src.services.cache import listing_cache, payment_cache
+from src.services.counters import service_counters
+from src.workers.event_indexer import EventIndexer
+from src.workers.payment_confirmation import PaymentConfirmationWorker
+
+celery_app = Celery("x402", broker=settings.CELERY_BROKER_URL)
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_BROKER_URL.startswith("memory://"),
+    task_ignore_result=True,
+    beat_schedule={},
+)
+if settings.PAYMENT_WORKER_MODE == "celery":
+    celery_app.conf.beat_schedule["confirm-pending-payments"] = {
+        "task": "payments.confirm_pending",
+        "schedule": settings.PAYMENT_WORKER_INTERVAL,
+        # Drop runs that queue up behind a slow one instead of piling them on
+        "options": {"expires": settings.PAYMENT_WORKER_INTERVAL},
+    }
+if settings.INDEXER_MODE == "celery":
+    celery_app.conf.beat_schedule["index-contract-events"] = {
+        "task": "indexer.run",
+        "schedule": settings.INDEXER_INTERVAL,
+        "options": {"expires": settings.INDEXER_INTERVAL},
+    }
+
+# Round-robin position through the pending set, kept per worker process
+_payment_cursor: Optional[UUID] = None
+
+
+def _run_isolated(job):
+    """Run `job(session_factory, blockchain)` on a fresh event loop
+
+    Every task runs under its own asyncio.run, so it gets an unpooled engine
+    and RPC session instead of the app's loop-bound ones, and drops the
+    module-level caches' Redis connections before the loop closes (the next
+    task's loop reconnects them).
+    """
+    async def run():
+        engine = create_async_engine(async_database_url, poolclass=NullPool)
+        blockchain = BlockchainService()
+        try:
+            return await job(async_sessionmaker(engine, expire_on_commit=False), blockchain)
+        finally:
+            await blockchain.close()
+            await engine.dispose()
+            await listing_cache.close()
+            await payment_cache.close()
+            await service_counters.close()
+
+    return asyncio.run(run())
+
+
+async def _confirm_pending_payments(session_factory, blockchain) -> Dict[str, int]:
+    global _payment_cursor
+    worker = PaymentConfirmationWorker(session_factory=session_factory, blockchain=blockchain)
+    worker.cursor = _payment_cursor
+    stats = await worker.run_once()
+    _payment_cursor = worker.cursor
+    return stats
+
+
+async def _index_contract_events(session_factory, blockchain) -> Dict[str, int]:
+    return await EventIndexer(session_factory=session_factory, blockchain=blockchain).run_once()
+
+
+@celery_app.task(name="payments.confirm_pending")
+def confirm_pending_payments() -> Dict[str, int]:
+    """Confirm one round of pending payments"""
+    return _run_isolated(_confirm_pending_payments)
+
+
+@celery_app.task(name="indexer.run")
+def index_contract_events() -> Dict[str, int]:
+    """Index up to INDEXER_MAX_RANGES block ranges of contract events"""
+    return _run_isolated(_index_contract_events)
@@ -0,0 +1,433 @@
+"""
+Contract event indexer.
+
+Pulls eth_getLogs in block ranges from the last checkpoint up to
+head - INDEXER_CONFIRMATIONS and bulk-upserts what the events describe:
+
+- Market ServiceListed/Delisted/Updated/Rated/UsageRecorded: the listing's
+  current state is read back with getServiceListing (aggregated through
+  Multicall3) and upserted into `services`, so replays are idempotent.
+  call_count and the rating aggregates belong to ServiceCounters: the chain's
+  call count only seeds a new row, and its average stands in for `rating`
+  until the service has API ratings
+- Agent TradeExecuted: inserted into `transactions` for known agents
+- Agent X402PaymentProcessed / X402PaymentHandler PaymentProcessed: inserted
+  into `payments` as confirmed, or confirm the matching pending payment
+
+Logs are filtered by emitting contract: the Market and payment handler, and
+the agent contracts in `agents` (events of agents we don't know could not
+be stored anyway), so other contracts' logs with the same signatures are
+never fetched.
+
+Each range is applied in one DB transaction together with its checkpoint.
+The range size adapts: halved when the RPC rejects a query (too many
+results, timeouts) or returns more than INDEXER_TARGET_LOGS logs, doubled
+when it returns few. If the checkpointed block's hash no longer matches the
+chain, the indexer rewinds INDEXER_REORG_DEPTH blocks: transactions from the
+orphaned blocks are deleted and payments confirmed (or failed) there go back
+to pending, in the same DB transaction as the checkpoint, before the blocks
+are re-ingested. Addresses are stored lowercase, like the seed data.
+"""
+import asyncio
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import ClientError
+from eth_abi import decode, encode
+from sqlalchemy import bindparam, case, delete, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.sql import func
+from web3 import Web3
+
+from src.config import settings
+from src.database import AsyncSessionLocal, dialect_insert
+from src.models import Agent, IndexerCheckpoint, Payment, Service, Transaction
+from src.services.blockchain import BlockchainRPCError, BlockchainService, get_blockchain_service
+from src.services.cache import listing_cache, payment_cache
+
+INDEXER_MODES = ("off", "inprocess", "celery")
+
+CHECKPOINT_NAME = "contracts"
+
+# Agent contract addresses per eth_getLogs filter (providers cap filter size)
+AGENT_ADDRESSES_PER_FILTER = 500
+
+
+def _topic(signature: str) -> str:
+    return Web3.keccak(text=signature).hex().removeprefix("0x")
+
+
+def _selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+MARKET_EVENTS = {
+    _topic("ServiceListed(address,string,uint8,address)"): "ServiceListed",
+    _topic("ServiceDelisted(address,address)"): "ServiceDelisted",
+    _topic("ServiceUpdated(address,string,uint256)"): "ServiceUpdated",
+    _topic("ServiceRated(address,address,uint256,string)"): "ServiceRated",
+    _topic("ServiceUsageRecorded(address,address,uint256)"): "ServiceUsageRecorded",
+}
+TRADE_EXECUTED = _topic("TradeExecuted(address,uint256,bool,uint256,bytes32)")
+AGENT_PAYMENT_PROCESSED = _topic("X402PaymentProcessed(bytes32,address,uint256)")
+HANDLER_PAYMENT_PROCESSED = _topic("PaymentProcessed(bytes32,address,address,uint256,address)")
+
+GET_SERVICE_LISTING = _selector("getServiceListing(address)")
+SERVICE_LISTING_TYPE = "(address,string,string,uint8,uint256,address,uint256,uint256,uint256,bool,uint256,uint256)"
+# Service.ServiceType enum order
+SERVICE_TYPE_NAMES = ("strategy", "risk_control", "data_source", "other")
+RATING_SCALE = 100  # Market.RATING_SCALE
+
+payments_table = Payment.__table__
+services_table = Service.__table__
+
+# Written only when the indexer inserts a service; ServiceCounters adds
+# API payments and ratings to them afterwards
+SERVICE_COUNTER_COLUMNS = ("call_count", "rating")
+
+CONFIRM_PAYMENT_BY_ID = (
+    update(payments_table)
+    .where(payments_table.c.payment_id == bindparam("_payment_id"), payments_table.c.status == "pending")
+    .values(status="confirmed", block_number=bindparam("_block_number"))
+)
+
+
+def _hex_to_int(value: str) -> int:
+    return int(value, 16)
+
+
+def _topic_hex(value: str) -> str:
+    return value.lower().removeprefix("0x")
+
+
+def _topic_address(topic: str) -> str:
+    return "0x" + topic[-40:].lower()
+
+
+def _from_wei(value: int) -> Decimal:
+    return Decimal(Web3.from_wei(value, "ether"))
+
+
+class EventIndexer:
+    """Incrementally ingests Market/Agent/X402 contract events"""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        blockchain: Optional[BlockchainService] = None,
+        market_address: Optional[str] = None,
+        payment_handler_address: Optional[str] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.blockchain = blockchain or get_blockchain_service()
+        market_address = market_address or settings.MARKET_CONTRACT_ADDRESS
+        handler_address = payment_handler_address or settings.X402_PAYMENT_CONTRACT
+        self.market_address = market_address.lower() if market_address else None
+        self.handler_address = handler_address.lower() if handler_address else None
+        self.confirmations = settings.INDEXER_CONFIRMATIONS
+        self.reorg_depth = settings.INDEXER_REORG_DEPTH
+        self.max_block_range = settings.INDEXER_MAX_BLOCK_RANGE
+        self.target_logs = settings.INDEXER_TARGET_LOGS
+        self.block_range = min(settings.INDEXER_BLOCK_RANGE, self.max_block_range)
+
+        contract_topics = []
+        if self.market_address:
+            contract_topics.extend(MARKET_EVENTS)
+        if self.handler_address:
+            contract_topics.append(HANDLER_PAYMENT_PROCESSED)
+        self.contract_topics = ["0x" + topic for topic in contract_topics]
+        self.contract_addresses = [address for address in (self.market_address, self.handler_address) if address]
+        self.agent_topics = ["0x" + TRADE_EXECUTED, "0x" + AGENT_PAYMENT_PROCESSED]
+
+    async def _load_checkpoint(self) -> Optional[Tuple[int, Optional[str]]]:
+        async with self.session_factory() as db:
+            checkpoint = await db.get(IndexerCheckpoint, CHECKPOINT_NAME)
+            if checkpoint is None:
+                return None
+            return int(checkpoint.block_number), checkpoint.block_hash
+
+    async def _start_block(self) -> int:
+        """First block to index, rewinding when the checkpointed block was reorged out"""
+        checkpoint = await self._load_checkpoint()
+        if checkpoint is None:
+            return settings.INDEXER_START_BLOCK
+
+        block_number, block_hash = checkpoint
+        if block_hash:
+            (block,) = await self.blockchain.rpc_batch([("eth_getBlockByNumber", [hex(block_number), False])])
+            if block is None or block["hash"].lower() != block_hash:
+                start = max(settings.INDEXER_START_BLOCK, block_number - self.reorg_depth + 1)
+                print(f"⚠️  Indexer: reorg detected at block {block_number}, re-indexing from {start}")
+                await self._rewind(start)
+                return start
+        return block_number + 1
+
+    async def _rewind(self, start: int):
+        """Undo what blocks >= start contributed and checkpoint start - 1
+
+        The new checkpoint carries start - 1's current hash, so a reorg
+        deeper than INDEXER_REORG_DEPTH is detected on the next run and
+        rewinds further.
+        """
+        previous_hash = None
+        if start > 0:
+            (block,) = await self.blockchain.rpc_batch([("eth_getBlockByNumber", [hex(start - 1), False])])
+            previous_hash = block["hash"].lower() if block else None
+
+        async with self.session_factory() as db:
+            result = await db.execute(delete(Transaction).where(Transaction.block_number >= start))
+            removed = max(result.rowcount, 0)
+            result = await db.execute(
+                update(Payment)
+                .where(Payment.block_number >= start, Payment.status.in_(("confirmed", "failed")))
+                .values(status="pending", block_number=None)
+                .returning(Payment.payment_id)
+            )
+            reverted = list(result.scalars())
+            await db.execute(
+                update(IndexerCheckpoint)
+                .where(IndexerCheckpoint.name == CHECKPOINT_NAME)
+                .values(block_number=start - 1, block_hash=previous_hash, updated_at=func.now())
+            )
+            await db.commit()
+
+        # Outcomes cached from the orphaned blocks are no longer true. This clears
+        # Redis and this process; other workers' local copies expire within
+        # PAYMENT_CACHE_CONFIRMED_TTL, HTTP caches revalidate after HTTP_CACHE_MAX_AGE
+        await payment_cache.forget(*reverted)
+        await listing_cache.invalidate()
+        print(f"⚠️  Indexer: rolled back {removed} transactions and {len(reverted)} payments from block {start}")
+
+    async def _agent_addresses(self) -> List[str]:
+        async with self.session_factory() as db:
+            result = await db.execute(select(Agent.contract_address))
+            return sorted({address.lower() for address in result.scalars()})
+
+    async def _fetch_range(
+        self, from_block: int, to_block: int, agent_addresses: List[str]
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Logs for [from_block, to_block] and the hash of to_block, in one round trip"""
+        blocks = {"fromBlock": hex(from_block), "toBlock": hex(to_block)}
+        filters = []
+        if self.contract_topics:
+            filters.append({**blocks, "address": self.contract_addresses, "topics": [self.contract_topics]})
+        for i in range(0, len(agent_addresses), AGENT_ADDRESSES_PER_FILTER):
+            addresses = agent_addresses[i:i + AGENT_ADDRESSES_PER_FILTER]
+            filters.append({**blocks, "address": addresses, "topics": [self.agent_topics]})
+
+        *log_lists, block = await self.blockchain.rpc_batch(
+            [("eth_getLogs", [log_filter]) for log_filter in filters]
+            + [("eth_getBlockByNumber", [hex(to_block), False])]
+        )
+        logs = [log for batch in log_lists for log in batch if not log.get("removed")]
+        logs.sort(key=lambda log: (_hex_to_int(log["blockNumber"]), _hex_to_int(log["logIndex"])))
+        return logs, block["hash"].lower() if block else None
+
+    async def _read_listings(self, service_addresses: List[str]) -> List[Dict[str, Any]]:
+        """Current Market listings as `services` rows"""
+        calls = [
+            (Web3.to_checksum_address(self.market_address), GET_SERVICE_LISTING + encode(["address"], [address]))
+            for address in service_addresses
+        ]
+        rows = []
+        for data in await self.blockchain.aggregate_calls(calls):
+            if not data:
+                continue
+            (listing,) = decode([SERVICE_LISTING_TYPE], data)
+            (service_address, name, description, service_type, price, provider,
+             average_rating, _rating_count, call_count, is_listed, _listed_at, _updated_at) = listing
+            if int(provider, 16) == 0:
+                # Never listed
+                continue
+            rows.append({
+                "contract_address": service_address.lower(),
+                "provider_address": provider.lower(),
+                "name": name,
+                "description": description,
+                "service_type": SERVICE_TYPE_NAMES[service_type] if service_type < len(SERVICE_TYPE_NAMES) else "other",
+                "price": _from_wei(price),
+                "rating": Decimal(average_rating) / RATING_SCALE,
+                "call_count": call_count,
+                "status": "active" if is_listed else "delisted",
+            })
+        return rows
+
+    async def _apply(self, logs: List[dict], to_block: int, block_hash: Optional[str]) -> Dict[str, int]:
+        """Write one range's events and its checkpoint in a single transaction"""
+        stats = {"services": 0, "transactions": 0, "payments": 0}
+
+        service_addresses: Dict[str, None] = {}
+        agent_logs, payment_logs = [], []
+        for log in logs:
+            address = log["address"].lower()
+            topic0 = _topic_hex(log["topics"][0])
+            if topic0 in MARKET_EVENTS and address == self.market_address:
+                service_addresses[_topic_address(log["topics"][1])] = None
+            elif topic0 in (TRADE_EXECUTED, AGENT_PAYMENT_PROCESSED):
+                agent_logs.append(log)
+            elif topic0 == HANDLER_PAYMENT_PROCESSED and address == self.handler_address:
+                payment_logs.append(log)
+
+        service_rows = await self._read_listings(list(service_addresses)) if service_addresses else []
+
+        async with self.session_factory() as db:
+            agent_ids = {}
+            agent_addresses = {log["address"].lower() for log in agent_logs}
+            if agent_addresses:
+                result = await db.execute(
+                    select(Agent.contract_address, Agent.id).where(Agent.contract_address.in_(agent_addresses))
+                )
+                agent_ids = dict(result.all())
+
+            transaction_rows = {}
+            payment_rows = {}
+            for log in agent_logs + payment_logs:
+                topic0 = _topic_hex(log["topics"][0])
+                data = Web3.to_bytes(hexstr=log["data"])
+                tx_hash = log["transactionHash"].lower()
+                block_number = _hex_to_int(log["blockNumber"])
+                agent_id = agent_ids.get(log["address"].lower())
+
+                if topic0 == TRADE_EXECUTED:
+                    if agent_id is None:
+                        continue
+                    amount, is_buy, price = decode(["uint256", "bool", "uint256"], data)
+                    # The event's own txHash field is always zero; key trades by the log's transaction
+                    transaction_rows.setdefault(tx_hash, {
+                        "agent_id": agent_id,
+                        "tx_hash": tx_hash,
+                        "transaction_type": "buy" if is_buy else "sell",
+                        "token_address": _topic_address(log["topics"][1]),
+                        "amount": _from_wei(amount),
+                        "price": _from_wei(price),
+                        "status": "success",
+                        "block_number": block_number,
+                    })
+                else:
+                    if topic0 == AGENT_PAYMENT_PROCESSED:
+                        if agent_id is None:
+                            continue
+                        (amount,) = decode(["uint256"], data)
+                    else:
+                        amount, _token = decode(["uint256", "address"], data)
+                    payment_id = "0x" + _topic_hex(log["topics"][1])
+                    row = payment_rows.setdefault(payment_id, {
+                        "agent_id": None,
+                        "tx_hash": tx_hash,
+                        "payment_id": payment_id,
+                        "amount": _from_wei(amount),
+                        "payment_type": "service_call",
+                        "status": "confirmed",
+                        "block_number": block_number,
+                    })
+                    row["agent_id"] = row["agent_id"] or agent_id
+
+            # executemany: rows go out in insertmanyvalues batches, so a busy
+            # range never exceeds the database's bind parameter limit
+            if service_rows:
+                insert = dialect_insert(Service)
+                excluded = insert.excluded
+                await db.execute(insert.on_conflict_do_update(
+                    index_elements=["contract_address"],
+                    set_={
+                        **{
+                            column: getattr(excluded, column) for column in service_rows[0]
+                            if column != "contract_address" and column not in SERVICE_COUNTER_COLUMNS
+                        },
+                        # rating_sum / rating_count only count service_ratings rows
+                        "rating": case(
+                            (services_table.c.rating_count == 0, excluded.rating), else_=services_table.c.rating
+                        ),
+                        "updated_at": func.now(),
+                    },
+                ), service_rows)
+                stats["services"] = len(service_rows)
+
+            if transaction_rows:
+                result = await db.execute(
+                    dialect_insert(Transaction).on_conflict_do_nothing().returning(Transaction.id),
+                    list(transaction_rows.values())
+                )
+                stats["transactions"] = len(result.all())
+
+            if payment_rows:
+                await db.execute(dialect_insert(Payment).on_conflict_do_nothing(), list(payment_rows.values()))
+                # Payments recorded through the API are still pending; confirm them
+                await db.execute(CONFIRM_PAYMENT_BY_ID, [
+                    {"_payment_id": row["payment_id"], "_block_number": row["block_number"]}
+                    for row in payment_rows.values()
+                ])
+                stats["payments"] = len(payment_rows)
+
+            checkpoint = dialect_insert(IndexerCheckpoint).values(
+                name=CHECKPOINT_NAME, block_number=to_block, block_hash=block_hash
+            )
+            await db.execute(checkpoint.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"block_number": checkpoint.excluded.block_number, "block_hash": checkpoint.excluded.block_hash,
+                      "updated_at": func.now()},
+            ))
+            await db.commit()
+
+        if service_rows:
+            await listing_cache.invalidate()
+        return stats
+
+    def _adapt_range(self, log_count: int):
+        if log_count > self.target_logs:
+            self.block_range = max(1, self.block_range // 2)
+        elif log_count < self.target_logs // 4:
+            self.block_range = min(self.max_block_range, self.block_range * 2)
+
+    async def run_once(self, max_ranges: Optional[int] = None) -> Dict[str, Any]:
+        """Index up to `max_ranges` block ranges; returns counts and whether it caught up"""
+        max_ranges = max_ranges or settings.INDEXER_MAX_RANGES
+        stats = {"ranges": 0, "logs": 0, "services": 0, "transactions": 0, "payments": 0, "caught_up": False}
+
+        (head,) = await self.blockchain.rpc_batch([("eth_blockNumber", [])])
+        safe_block = _hex_to_int(head) - self.confirmations
+        from_block = await self._start_block()
+        agent_addresses = await self._agent_addresses()
+
+        while stats["ranges"] < max_ranges and from_block <= safe_block:
+            to_block = min(from_block + self.block_range - 1, safe_block)
+            try:
+                logs, block_hash = await self._fetch_range(from_block, to_block, agent_addresses)
+            except (BlockchainRPCError, ClientError, asyncio.TimeoutError) as e:
+                if self.block_range == 1:
+                    raise
+                # Providers cap range/result size; retry the same start with a smaller range
+                self.block_range = max(1, self.block_range // 2)
+                print(f"⚠️  Indexer: eth_getLogs {from_block}-{to_block} failed ({e}), range -> {self.block_range}")
+                continue
+
+            applied = await self._apply(logs, to_block, block_hash)
+            for key, value in applied.items():
+                stats[key] += value
+            stats["ranges"] += 1
+            stats["logs"] += len(logs)
+            self._adapt_range(len(logs))
+            from_block = to_block + 1
+
+        stats["caught_up"] = from_block > safe_block
+        stats["block"] = from_block - 1
+        return stats
+
+    async def run_forever(self, interval: Optional[float] = None):
+        """Index continuously; sleeps `interval` seconds whenever it has caught up"""
+        interval = interval or settings.INDEXER_INTERVAL
+        while True:
+            try:
+                stats = await self.run_once()
+                if stats["logs"]:
+                    print(
+                        f"✅ Indexer: block {stats['block']}, {stats['logs']} logs "
+                        f"({stats['services']} services, {stats['transactions']} transactions, "
+                        f"{stats['payments']} payments)"
+                    )
+                caught_up = stats["caught_up"]
+            except Exception as e:
+                print(f"⚠️  Indexer run failed: {e}")
+                caught_up = True
+            if caught_up:
+                await asyncio.sleep(interval)
@@ -0,0 +1,147 @@
+"""
+Payment confirmation worker.
+
+Payments are recorded as `pending`. This worker pages through pending
+payments in batches, fetches their receipts with batched JSON-RPC and writes
+status/block_number back with one executemany UPDATE per batch, once the
+receipt is PAYMENT_WORKER_CONFIRMATIONS blocks deep. It runs either
+in-process (an asyncio task started by the app lifespan, PAYMENT_WORKER_MODE=
+inprocess) or as a Celery beat task (src/workers/celery_app.py).
+"""
+import asyncio
+import re
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.models import Payment
+from src.services.blockchain import BlockchainService, get_blockchain_service
+
+PAYMENT_WORKER_MODES = ("off", "inprocess", "celery")
+
+TX_HASH_PATTERN = re.compile(r"^0x[0-9a-fA-F]{64}$")
+
+payments_table = Payment.__table__
+
+# Only pending rows are touched, so concurrent workers (or a manual
+# update_payment_status) never overwrite a final status
+CONFIRM_PAYMENT = (
+    update(payments_table)
+    .where(payments_table.c.id == bindparam("_id"), payments_table.c.status == "pending")
+    .values(status=bindparam("_status"), block_number=bindparam("_block_number"))
+)
+
+
+class PaymentConfirmationWorker:
+    """Confirms pending payments from their on-chain receipts
+
+    Each run_once() reads up to `max_batches` pages of `batch_size` pending
+    payments (keyset on id) and processes up to `concurrency` batches at a
+    time. The cursor carries over between runs and wraps around at the end,
+    so a backlog larger than one run is covered round-robin. Payments whose
+    transaction is unknown, still unmined or mined fewer than
+    `confirmations` blocks below head stay pending.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        blockchain: Optional[BlockchainService] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_batches: Optional[int] = None,
+        confirmations: Optional[int] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.blockchain = blockchain or get_blockchain_service()
+        self.batch_size = batch_size or settings.PAYMENT_WORKER_BATCH_SIZE
+        self.concurrency = concurrency or settings.PAYMENT_WORKER_CONCURRENCY
+        self.max_batches = max_batches or settings.PAYMENT_WORKER_MAX_BATCHES
+        self.confirmations = settings.PAYMENT_WORKER_CONFIRMATIONS if confirmations is None else confirmations
+        self.cursor = None  # id of the last pending payment read
+
+    async def _next_page(self) -> list:
+        """Next page of (id, tx_hash) for pending payments after the cursor"""
+        query = select(Payment.id, Payment.tx_hash).where(Payment.status == "pending")
+        if self.cursor is not None:
+            query = query.where(Payment.id > self.cursor)
+        query = query.order_by(Payment.id).limit(self.batch_size)
+
+        async with self.session_factory() as db:
+            page = (await db.execute(query)).all()
+        # A short page means the end of the pending set; start over next time
+        self.cursor = page[-1].id if len(page) == self.batch_size else None
+        return page
+
+    async def _process_batch(self, page: list, head: int, semaphore: asyncio.Semaphore) -> Dict[str, int]:
+        """Look up receipts for one batch and apply the final statuses"""
+        stats = {"checked": len(page), "confirmed": 0, "failed": 0, "errors": 0}
+        # Malformed hashes can never confirm and would fail the whole RPC batch
+        tx_hashes = [row.tx_hash for row in page if TX_HASH_PATTERN.match(row.tx_hash)]
+        if not tx_hashes:
+            return stats
+
+        async with semaphore:
+            try:
+                transactions = await self.blockchain.get_transactions(tx_hashes)
+            except Exception as e:
+                print(f"⚠️  Payment worker: receipt lookup failed for {len(tx_hashes)} payments: {e}")
+                stats["errors"] = len(tx_hashes)
+                return stats
+
+            updates = []
+            for row in page:
+                tx = transactions.get(row.tx_hash)
+                if tx is None or tx["status"] is None:
+                    continue
+                # Too shallow to survive a reorg yet; checked again next run
+                if head - tx["block_number"] < self.confirmations:
+                    continue
+                status = "confirmed" if tx["status"] == 1 else "failed"
+                stats[status] += 1
+                updates.append({"_id": row.id, "_status": status, "_block_number": tx["block_number"]})
+
+            if updates:
+                async with self.session_factory() as db:
+                    await db.execute(CONFIRM_PAYMENT, updates)
+                    await db.commit()
+        return stats
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Process one round of pending payments; returns counts"""
+        (head,) = await self.blockchain.rpc_batch([("eth_blockNumber", [])])
+        head = int(head, 16)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        for _ in range(self.max_batches):
+            page = await self._next_page()
+            if page:
+                # Later pages are read while earlier batches wait on RPC
+                tasks.append(asyncio.create_task(self._process_batch(page, head, semaphore)))
+            if self.cursor is None:
+                break
+
+        totals = {"checked": 0, "confirmed": 0, "failed": 0, "errors": 0}
+        for stats in await asyncio.gather(*tasks):
+            for key, value in stats.items():
+                totals[key] += value
+        totals["pending"] = totals["checked"] - totals["confirmed"] - totals["failed"]
+        return totals
+
+    async def run_forever(self, interval: Optional[float] = None):
+        """Poll every `interval` seconds until cancelled"""
+        interval = interval or settings.PAYMENT_WORKER_INTERVAL
+        while True:
+            try:
+                stats = await self.run_once()
+                if stats["confirmed"] or stats["failed"]:
+                    print(
+                        f"✅ Payment worker: {stats['confirmed']} confirmed, "
+                        f"{stats['failed']} failed, {stats['pending']} still pending"
+                    )
+            except Exception as e:
+                print(f"⚠️  Payment worker run failed: {e}")
+            await asyncio.sleep(interval)